@@ -0,0 +1,161 @@
+import numpy as np
+import pandas as pd
+
+
+# -----------------------------------------------------------------------------
+# 1. 수익률 행렬 구성
+# -----------------------------------------------------------------------------
+def build_price_matrix(frames):
+    """wide CSV 여러 개를 (시각 x 아이템) 1시간 간격 가격 행렬 하나로 병합
+
+    수집 시각이 불규칙하므로 정시 단위로 맞춰 윈도우(행 수)가 곧 시간 길이가 되도록 한다.
+    """
+    series = []
+    for df in frames:
+        if df is None or df.empty:
+            continue
+        wide = df.drop(columns=['sub_category'], errors='ignore')
+        wide = wide.drop_duplicates(subset=['item_name']).set_index('item_name').T
+        wide.index = pd.to_datetime(wide.index, errors='coerce')
+        wide = wide[wide.index.notnull()]
+        series.append(wide.apply(pd.to_numeric, errors='coerce'))
+
+    if not series:
+        return pd.DataFrame()
+    prices = pd.concat(series, axis=1).sort_index()
+    prices = prices.loc[:, ~prices.columns.duplicated()]
+    return prices.resample('h').mean()
+
+
+def to_log_returns(prices, fill_limit=3):
+    """로그 수익률. 짧은 결측 구간은 직전 가격으로 채우고, 가격이 0 이하인 값은 제외"""
+    prices = prices.where(prices > 0).ffill(limit=fill_limit)
+    return np.log(prices).diff().iloc[1:]
+
+
+# -----------------------------------------------------------------------------
+# 2. 윈도우 상관행렬 (합계 누적 방식 증분 갱신)
+# -----------------------------------------------------------------------------
+class RollingCorrelation:
+    """최근 window개 수익률의 상관행렬을 합계(S1)와 곱합계(S2)로 유지
+
+    새 데이터가 들어오면 가장 오래된 행을 빼고 새 행을 더하는 O(N^2) 갱신만 수행한다.
+    결측 수익률은 0(가격 변동 없음)으로 취급한다.
+    """
+
+    def __init__(self, window, columns):
+        self.window = window
+        self.columns = list(columns)
+        n = len(self.columns)
+        self.buffer = np.zeros((window, n))
+        self.pos = 0
+        self.count = 0
+        self.s1 = np.zeros(n)
+        self.s2 = np.zeros((n, n))
+        self.last_index = None
+
+    def copy(self):
+        state = RollingCorrelation(self.window, self.columns)
+        state.buffer = self.buffer.copy()
+        state.pos = self.pos
+        state.count = self.count
+        state.s1 = self.s1.copy()
+        state.s2 = self.s2.copy()
+        state.last_index = self.last_index
+        return state
+
+    @classmethod
+    def from_returns(cls, returns, window):
+        state = cls(window, returns.columns)
+        state.extend(returns)
+        return state
+
+    def extend(self, returns):
+        """여러 행을 한 번에 반영. 윈도우보다 긴 입력은 마지막 window행만 행렬곱으로 재계산"""
+        if returns.empty:
+            return
+        values = returns.reindex(columns=self.columns).fillna(0.0).to_numpy()
+        if len(values) >= self.window:
+            tail = values[-self.window:]
+            self.buffer[:] = tail
+            self.pos = 0
+            self.count = self.window
+            self.s1 = tail.sum(axis=0)
+            self.s2 = tail.T @ tail
+        else:
+            for row in values:
+                self._push(row)
+        self.last_index = returns.index[-1]
+
+    def _push(self, row):
+        if self.count == self.window:
+            old = self.buffer[self.pos]
+            self.s1 -= old
+            self.s2 -= np.outer(old, old)
+        else:
+            self.count += 1
+        self.buffer[self.pos] = row
+        self.s1 += row
+        self.s2 += np.outer(row, row)
+        self.pos = (self.pos + 1) % self.window
+
+    def matrix(self, min_periods=12):
+        n = self.count
+        if n < max(min_periods, 2):
+            return pd.DataFrame(index=self.columns, columns=self.columns, dtype=float)
+        cov = (self.s2 - np.outer(self.s1, self.s1) / n) / (n - 1)
+        std = np.sqrt(np.clip(np.diag(cov), 0, None))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            corr = cov / np.outer(std, std)
+        # 윈도우 내 가격 변동이 없는 아이템은 상관계수 정의 불가 (NaN)
+        corr[std == 0, :] = np.nan
+        corr[:, std == 0] = np.nan
+        np.fill_diagonal(corr, 1.0)
+        return pd.DataFrame(np.clip(corr, -1, 1), index=self.columns, columns=self.columns)
+
+
+_STATE_CACHE = {}
+
+
+def get_correlation_matrix(returns, window):
+    """(윈도우, 아이템 구성)별 상태를 캐싱하고, 새로 추가된 수익률 행만 증분 반영
+
+    캐시된 상태는 여러 세션 스레드가 공유하므로 직접 수정하지 않고 복사본을 갱신해 교체한다.
+    """
+    key = (window, tuple(returns.columns))
+    state = _STATE_CACHE.get(key)
+    if state is None or state.last_index not in returns.index:
+        state = RollingCorrelation.from_returns(returns, window)
+    else:
+        new_rows = returns.loc[returns.index > state.last_index]
+        if not new_rows.empty:
+            state = state.copy()
+            state.extend(new_rows)
+    _STATE_CACHE[key] = state
+    return state.matrix()
+
+
+# -----------------------------------------------------------------------------
+# 3. 조회
+# -----------------------------------------------------------------------------
+def most_correlated(corr, item, top_n=10):
+    """item과 상관계수가 높은/낮은 아이템 목록"""
+    if item not in corr.columns:
+        return pd.DataFrame()
+    values = corr[item].drop(index=item).dropna().sort_values(ascending=False)
+    return pd.DataFrame({
+        '양의 상관': values.index[:top_n],
+        '상관계수(+)': values.values[:top_n].round(3),
+    }).join(pd.DataFrame({
+        '음의 상관': values.index[::-1][:top_n],
+        '상관계수(-)': values.values[::-1][:top_n].round(3),
+    }), how='outer')
+
+
+def rolling_corr_with(returns, item, others, window):
+    """item과 선택 아이템들의 시점별 이동 상관계수 (열 단위 벡터 연산)"""
+    if item not in returns.columns:
+        return pd.DataFrame()
+    others = [o for o in others if o in returns.columns and o != item]
+    filled = returns.fillna(0.0)
+    return filled[others].rolling(window=window, min_periods=max(window // 2, 2)).corr(filled[item])
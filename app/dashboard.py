@@ -3,6 +3,8 @@ import pandas as pd
 import plotly.graph_objects as go
 import os
 from datetime import datetime, timedelta
+from profiler import RenderProfiler, is_profiling_enabled
+from correlation import build_price_matrix, to_log_returns, get_correlation_matrix, most_correlated, rolling_corr_with
 
 # -----------------------------------------------------------------------------
 # 1. 페이지 설정
@@ -14,24 +16,10 @@ st.set_page_config(
 
 st.title("LoaQuant")
 
-st.markdown("""
-    <style>
-    .stTabs [data-baseweb="tab-list"] { gap: 20px; }
-    .stTabs [data-baseweb="tab"] { 
-        height: 50px; 
-        white-space: pre-wrap; 
-        background-color: #ffffff; 
-        border-radius: 4px 4px 0 0; 
-        gap: 1px; 
-        padding-top: 10px; 
-        padding-bottom: 10px; 
-    }
-    .stTabs [aria-selected="true"] { 
-        background-color: #ffffff; 
-        border-bottom: 2px solid #ff4b4b; 
-    }
-    </style>
-    """, unsafe_allow_html=True)
+# 렌더링 프로파일링 (?profile=1 또는 LOAQUANT_PROFILE=1)
+profiler = RenderProfiler(is_profiling_enabled(st.query_params))
+PROFILE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "profile")
+
 st.info("GitHub Actions를 통해 매시간 수집된 데이터를 시각화합니다.")
 
 
@@ -51,6 +39,39 @@ def load_data(file_name):
     return df
 
 
+@st.cache_data(ttl=600)
+def load_returns(file_names):
+    prices = build_price_matrix([load_data(f) for f in file_names])
+    return to_log_returns(prices) if not prices.empty else pd.DataFrame()
+
+
+@st.cache_data(ttl=600)
+def load_forecasts():
+    # economy/forecaster.py가 미리 계산한 결과만 읽음 (페이지 로드 시 모델 적합 없음)
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    project_root = os.path.dirname(current_dir)
+    file_path = os.path.join(project_root, "data", "forecast", "forecasts.csv")
+
+    if not os.path.exists(file_path):
+        return None
+
+    df = pd.read_csv(file_path)
+    df['forecast_at'] = pd.to_datetime(df['forecast_at'])
+    return df.drop_duplicates(subset=['item_name', 'forecast_at'], keep='last')
+
+
+@st.cache_data(ttl=600)
+def load_header(file_name):
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    project_root = os.path.dirname(current_dir)
+    file_path = os.path.join(project_root, "data", file_name)
+
+    if not os.path.exists(file_path):
+        return None
+
+    return list(pd.read_csv(file_path, nrows=0).columns)
+
+
 def load_event_logs():
     events = {}
     current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -183,12 +204,15 @@ def draw_stock_chart(df, title_text=""):
     with col1:
         # 체크박스 키(key)를 유니크하게 설정
         show_bollinger = st.checkbox("볼린저 밴드", value=False, key=f"bollinger_{title_text}")
+    with col2:
+        show_forecast = st.checkbox("24시간 예측", value=False, key=f"forecast_{title_text}")
 
     st.markdown("##### 시장 분석 리포트")
 
     cols = st.columns(len(plot_df.columns))
     for idx, column in enumerate(plot_df.columns):
-        analysis = analyze_market_status(plot_df, column)
+        with profiler.stage("analyze_market_status", chart=title_text):
+            analysis = analyze_market_status(plot_df, column)
         with cols[idx]:
             if analysis is None:
                 st.caption(f"**{column}**: 데이터 부족")
@@ -221,84 +245,105 @@ def draw_stock_chart(df, title_text=""):
             </div>
             """, unsafe_allow_html=True)
 
-    fig = go.Figure()
+    forecasts = load_forecasts() if show_forecast else None
 
-    colors = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b', '#e377c2', '#7f7f7f', '#bcbd22',
-              '#17becf']
+    with profiler.stage("figure_build", chart=title_text):
+        fig = go.Figure()
 
-    for idx, column in enumerate(plot_df.columns):
-        line_color = colors[idx % len(colors)]
-
-        fig.add_trace(go.Scatter(
-            x=plot_df.index, y=plot_df[column],
-            mode='lines', name=column,
-            line=dict(width=2, color=line_color),
-            hovertemplate='%{x|%m/%d %H:%M} - %{y:,.0f} 골드<extra></extra>'
-        ))
-
-        if show_bollinger:
-            ma = plot_df[column].rolling(window=24).mean()
-            std = plot_df[column].rolling(window=24).std()
-            upper = ma + (std * 2)
-            lower = ma - (std * 2)
+        colors = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b', '#e377c2', '#7f7f7f', '#bcbd22',
+                  '#17becf']
 
-            fill_color_rgba = f"rgba{tuple(list(int(line_color.lstrip('#')[i:i + 2], 16) for i in (0, 2, 4)) + [0.1])}"
-
-            fig.add_trace(go.Scatter(
-                x=plot_df.index, y=upper, mode='lines',
-                line=dict(width=0), showlegend=False, hoverinfo='skip'
-            ))
+        for idx, column in enumerate(plot_df.columns):
+            line_color = colors[idx % len(colors)]
 
             fig.add_trace(go.Scatter(
-                x=plot_df.index, y=lower,
-                mode='lines',
-                name=f"{column} 볼린저 영역",
-                line=dict(width=0),
-                fill='tonexty',
-                fillcolor=fill_color_rgba,
-                showlegend=True,
-                hoverinfo='skip'
+                x=plot_df.index, y=plot_df[column],
+                mode='lines', name=column,
+                line=dict(width=2, color=line_color),
+                hovertemplate='%{x|%m/%d %H:%M} - %{y:,.0f} 골드<extra></extra>'
             ))
 
-            fig.add_trace(go.Scatter(
-                x=plot_df.index, y=ma, mode='lines',
-                line=dict(width=1, dash='dot', color=line_color),
-                hoverinfo='skip', showlegend=False
-            ))
-
-    min_date = df.index.min()
-    max_date = df.index.max()
-
-    if not pd.isnull(min_date) and not pd.isnull(max_date):
-        current_ptr = min_date.replace(hour=0, minute=0, second=0)
-        while current_ptr <= max_date:
-            if current_ptr.weekday() == 2:
-                patch_start = current_ptr.replace(hour=6, minute=0)
-                patch_end = current_ptr.replace(hour=10, minute=0)
-                if min_date <= patch_end and patch_start <= max_date:
-                    fig.add_vrect(
-                        x0=patch_start, x1=patch_end,
-                        fillcolor="rgba(128, 128, 128, 0.2)",
-                        layer="below", line_width=0,
-                        annotation_text="점검", annotation_position="top left",
-                        annotation_font=dict(color="gray", size=10)
-                    )
-            current_ptr += timedelta(days=1)
-
-        event_logs = load_event_logs()
-        for name, date_str in event_logs.items():
-            try:
-                event_date = pd.to_datetime(date_str).replace(hour=0, minute=0)
-                if min_date <= event_date <= max_date:
-                    fig.add_vline(x=event_date, line_width=2, line_dash="dot", line_color="#E74C3C")
-                    fig.add_annotation(
-                        x=event_date, y=1.05, yref="paper",
-                        text=name, showarrow=False,
-                        font=dict(color="#E74C3C", size=11),
-                        bgcolor="rgba(255, 255, 255, 0.9)"
-                    )
-            except:
-                continue
+            if show_bollinger:
+                ma = plot_df[column].rolling(window=24).mean()
+                std = plot_df[column].rolling(window=24).std()
+                upper = ma + (std * 2)
+                lower = ma - (std * 2)
+
+                fill_color_rgba = f"rgba{tuple(list(int(line_color.lstrip('#')[i:i + 2], 16) for i in (0, 2, 4)) + [0.1])}"
+
+                fig.add_trace(go.Scatter(
+                    x=plot_df.index, y=upper, mode='lines',
+                    line=dict(width=0), showlegend=False, hoverinfo='skip'
+                ))
+
+                fig.add_trace(go.Scatter(
+                    x=plot_df.index, y=lower,
+                    mode='lines',
+                    name=f"{column} 볼린저 영역",
+                    line=dict(width=0),
+                    fill='tonexty',
+                    fillcolor=fill_color_rgba,
+                    showlegend=True,
+                    hoverinfo='skip'
+                ))
+
+                fig.add_trace(go.Scatter(
+                    x=plot_df.index, y=ma, mode='lines',
+                    line=dict(width=1, dash='dot', color=line_color),
+                    hoverinfo='skip', showlegend=False
+                ))
+
+            if show_forecast and forecasts is not None:
+                fc = forecasts[forecasts['item_name'] == column]
+                if not fc.empty:
+                    fill_color_rgba = f"rgba{tuple(list(int(line_color.lstrip('#')[i:i + 2], 16) for i in (0, 2, 4)) + [0.15])}"
+                    fig.add_trace(go.Scatter(
+                        x=pd.concat([fc['forecast_at'], fc['forecast_at'][::-1]]),
+                        y=pd.concat([fc['upper'], fc['lower'][::-1]]),
+                        fill='toself', fillcolor=fill_color_rgba, line=dict(width=0),
+                        showlegend=False, hoverinfo='skip'
+                    ))
+                    fig.add_trace(go.Scatter(
+                        x=fc['forecast_at'], y=fc['yhat'],
+                        mode='lines', name=f"{column} 예측",
+                        line=dict(width=2, dash='dash', color=line_color),
+                        hovertemplate='%{x|%m/%d %H:%M} - 예측 %{y:,.0f} 골드<extra></extra>'
+                    ))
+
+    with profiler.stage("overlays", chart=title_text):
+        min_date = df.index.min()
+        max_date = df.index.max()
+
+        if not pd.isnull(min_date) and not pd.isnull(max_date):
+            current_ptr = min_date.replace(hour=0, minute=0, second=0)
+            while current_ptr <= max_date:
+                if current_ptr.weekday() == 2:
+                    patch_start = current_ptr.replace(hour=6, minute=0)
+                    patch_end = current_ptr.replace(hour=10, minute=0)
+                    if min_date <= patch_end and patch_start <= max_date:
+                        fig.add_vrect(
+                            x0=patch_start, x1=patch_end,
+                            fillcolor="rgba(128, 128, 128, 0.2)",
+                            layer="below", line_width=0,
+                            annotation_text="점검", annotation_position="top left",
+                            annotation_font=dict(color="gray", size=10)
+                        )
+                current_ptr += timedelta(days=1)
+
+            event_logs = load_event_logs()
+            for name, date_str in event_logs.items():
+                try:
+                    event_date = pd.to_datetime(date_str).replace(hour=0, minute=0)
+                    if min_date <= event_date <= max_date:
+                        fig.add_vline(x=event_date, line_width=2, line_dash="dot", line_color="#E74C3C")
+                        fig.add_annotation(
+                            x=event_date, y=1.05, yref="paper",
+                            text=name, showarrow=False,
+                            font=dict(color="#E74C3C", size=11),
+                            bgcolor="rgba(255, 255, 255, 0.9)"
+                        )
+                except:
+                    continue
 
     kor_days = ['월', '화', '수', '목', '금', '토', '일']
     tick_vals = pd.date_range(start=min_date.date(), end=max_date.date(), freq='D')
@@ -320,10 +365,13 @@ def draw_stock_chart(df, title_text=""):
         margin=dict(l=20, r=20, t=80, b=20),
         height=500
     )
-    st.plotly_chart(fig, use_container_width=True)
+    profiler.record_figure(fig, chart=title_text)
+    with profiler.stage("plotly_chart", chart=title_text):
+        st.plotly_chart(fig, use_container_width=True)
 
     st.markdown(f"#### 일평균 가격 (06시 기준)")
-    daily_df = get_loa_daily_avg_df(df)
+    with profiler.stage("daily_avg", chart=title_text):
+        daily_df = get_loa_daily_avg_df(df)
 
     if not daily_df.empty:
         fig_daily = go.Figure()
@@ -350,7 +398,9 @@ def draw_stock_chart(df, title_text=""):
             margin=dict(l=20, r=20, t=20, b=20),
             height=350
         )
-        st.plotly_chart(fig_daily, use_container_width=True)
+        profiler.record_figure(fig_daily, chart=f"{title_text} (일평균)")
+        with profiler.stage("plotly_chart", chart=f"{title_text} (일평균)"):
+            st.plotly_chart(fig_daily, use_container_width=True)
 
         st.markdown("##### 데이터 요약 표")
 
@@ -387,20 +437,24 @@ def draw_stock_chart(df, title_text=""):
             except:
                 return ""
 
-        st.dataframe(display_df.style.map(style_variance))
+        styled_df = display_df.style.map(style_variance)
+        if profiler.enabled:
+            # 셀 스타일 계산만 별도로 측정 (st.dataframe 내부에서 다시 계산되므로 프로파일링 시에만 실행)
+            with profiler.stage("style_variance", chart=title_text, cells=display_df.size):
+                styled_df.to_html()
+        with profiler.stage("dataframe", chart=title_text, cells=display_df.size):
+            st.dataframe(styled_df)
 
 
 # -----------------------------------------------------------------------------
 # 5. 데이터 로드 및 탭 구성
 # -----------------------------------------------------------------------------
-df_materials = load_data("market_materials.csv")
-df_lifeskill = load_data("market_lifeskill.csv")
-df_battle = load_data("market_battleitems.csv")
-df_engravings = load_data("market_engravings.csv")
-df_gems = load_data("market_gems.csv")
-
-if df_materials is not None and not df_materials.empty:
-    time_cols = pd.to_datetime(df_materials.columns, errors='coerce')
+# 수집 기간은 헤더 행만 읽어 표시하고, 시세 데이터는 선택한 분류만 로드
+with profiler.stage("load_header"):
+    header_cols = load_header("market_materials.csv")
+
+if header_cols is not None:
+    time_cols = pd.to_datetime(header_cols, format='%Y-%m-%d %H:%M', errors='coerce')
     time_cols = time_cols[time_cols.notnull()].sort_values()
 
     if not time_cols.empty:
@@ -419,16 +473,23 @@ if df_materials is not None and not df_materials.empty:
 else:
     st.info("데이터를 불러오는 중이거나 수집된 데이터가 없습니다.")
 
-tab1, tab2, tab3, tab4, tab5 = st.tabs(["강화 재료", "생활 재료", "배틀 아이템", "각인서", "보석"])
+section = st.radio(
+    "분류", ["강화 재료", "생활 재료", "배틀 아이템", "각인서", "보석", "상관관계"],
+    horizontal=True, label_visibility="collapsed", key="section"
+)
 
-with tab1:
+if section == "강화 재료":
+    profiler.tab = "강화 재료"
+    with profiler.stage("load_data"):
+        df_materials = load_data("market_materials.csv")
     st.subheader("강화 재료 시세")
     if df_materials is not None:
         all_items = sorted(df_materials['item_name'].unique())
         default_items = ["운명의 파괴석", "운명의 파괴석 결정"]
         valid_defaults = [i for i in default_items if i in all_items]
         selected = st.multiselect("확인할 재료를 선택하세요", all_items, default=valid_defaults)
-        chart_data = preprocess_for_chart(df_materials, selected)
+        with profiler.stage("preprocess_for_chart"):
+            chart_data = preprocess_for_chart(df_materials, selected)
         if not chart_data.empty:
             draw_stock_chart(chart_data, "강화 재료")
 
@@ -461,35 +522,118 @@ with tab1:
     else:
         st.warning("데이터 수집 중입니다.")
 
-with tab2:
+if section == "생활 재료":
+    profiler.tab = "생활 재료"
+    with profiler.stage("load_data"):
+        df_lifeskill = load_data("market_lifeskill.csv")
     st.subheader("생활 재료 시세")
     if df_lifeskill is not None:
         cat = st.selectbox("카테고리", df_lifeskill['sub_category'].unique())
         items = sorted(df_lifeskill[df_lifeskill['sub_category'] == cat]['item_name'].unique())
         sel_life = st.multiselect("재료 선택", items, default=items[:1])
-        c_data = preprocess_for_chart(df_lifeskill, sel_life)
+        with profiler.stage("preprocess_for_chart"):
+            c_data = preprocess_for_chart(df_lifeskill, sel_life)
         if not c_data.empty: draw_stock_chart(c_data, f"생활 재료 ({cat})")
 
-with tab3:
+if section == "배틀 아이템":
+    profiler.tab = "배틀 아이템"
+    with profiler.stage("load_data"):
+        df_battle = load_data("market_battleitems.csv")
     st.subheader("배틀 아이템 시세")
     if df_battle is not None:
         items = sorted(df_battle['item_name'].unique())
         sel_battle = st.multiselect("아이템 선택", items, default=items[:1])
-        c_data = preprocess_for_chart(df_battle, sel_battle)
+        with profiler.stage("preprocess_for_chart"):
+            c_data = preprocess_for_chart(df_battle, sel_battle)
         if not c_data.empty: draw_stock_chart(c_data, "배틀 아이템")
 
-with tab4:
+if section == "각인서":
+    profiler.tab = "각인서"
+    with profiler.stage("load_data"):
+        df_engravings = load_data("market_engravings.csv")
     st.subheader("유물 각인서 시세")
     if df_engravings is not None:
         items = sorted(df_engravings['item_name'].unique())
         sel_eng = st.multiselect("각인서 선택", items, default=items[:1])
-        c_data = preprocess_for_chart(df_engravings, sel_eng)
+        with profiler.stage("preprocess_for_chart"):
+            c_data = preprocess_for_chart(df_engravings, sel_eng)
         if not c_data.empty: draw_stock_chart(c_data, "유물 각인서")
 
-with tab5:
+if section == "보석":
+    profiler.tab = "보석"
+    with profiler.stage("load_data"):
+        df_gems = load_data("market_gems.csv")
     st.subheader("T4 보석 최저가")
     if df_gems is not None:
         items = sorted(df_gems['item_name'].unique())
         sel_gems = st.multiselect("보석 선택", items, default=items[:2])
-        c_data = preprocess_for_chart(df_gems, sel_gems)
-        if not c_data.empty: draw_stock_chart(c_data, "T4 보석")
\ No newline at end of file
+        with profiler.stage("preprocess_for_chart"):
+            c_data = preprocess_for_chart(df_gems, sel_gems)
+        if not c_data.empty: draw_stock_chart(c_data, "T4 보석")
+
+if section == "상관관계":
+    profiler.tab = "상관관계"
+    st.subheader("아이템 간 가격 동조화")
+    source_map = {
+        "강화 재료": "market_materials.csv", "생활 재료": "market_lifeskill.csv",
+        "배틀 아이템": "market_battleitems.csv", "각인서": "market_engravings.csv", "보석": "market_gems.csv"
+    }
+    sel_sources = st.multiselect("대상 분류", list(source_map.keys()), default=["강화 재료", "생활 재료"])
+    window_label = st.radio("상관계수 윈도우", ["24시간", "3일", "1주"], horizontal=True)
+    window = {"24시간": 24, "3일": 72, "1주": 168}[window_label]
+
+    with profiler.stage("correlation"):
+        returns = load_returns(tuple(source_map[k] for k in sel_sources))
+        corr = get_correlation_matrix(returns, window) if not returns.empty else pd.DataFrame()
+
+    if corr.empty or corr.isna().all().all():
+        st.warning("상관계수를 계산할 데이터가 부족합니다.")
+    else:
+        # 변동이 없어 상관계수가 정의되지 않는 아이템은 제외
+        valid = corr.columns[corr.notna().sum() > 1]
+        corr = corr.loc[valid, valid]
+
+        fig_corr = go.Figure(go.Heatmap(
+            z=corr.values, x=corr.columns, y=corr.index,
+            zmin=-1, zmax=1, colorscale="RdBu_r",
+            hovertemplate='%{y} / %{x}: %{z:.2f}<extra></extra>'
+        ))
+        fig_corr.update_layout(
+            title=dict(text=f"수익률 상관계수 ({window_label})", font=dict(size=18)),
+            template="plotly_white",
+            height=max(500, 14 * len(corr)),
+            margin=dict(l=20, r=20, t=60, b=20),
+            yaxis=dict(autorange="reversed")
+        )
+        profiler.record_figure(fig_corr, chart="상관계수 히트맵")
+        with profiler.stage("plotly_chart", chart="상관계수 히트맵"):
+            st.plotly_chart(fig_corr, use_container_width=True)
+
+        st.markdown("#### 상관관계 조회")
+        items = sorted(corr.columns)
+        default_idx = items.index("운명의 파괴석") if "운명의 파괴석" in items else 0
+        target = st.selectbox("기준 아이템", items, index=default_idx)
+        related = most_correlated(corr, target)
+        st.dataframe(related, hide_index=True)
+
+        top_items = list(related['양의 상관'].dropna()[:3]) if not related.empty else []
+        rolling = rolling_corr_with(returns, target, top_items, window)
+        if not rolling.empty:
+            fig_roll = go.Figure()
+            for column in rolling.columns:
+                fig_roll.add_trace(go.Scatter(
+                    x=rolling.index, y=rolling[column], mode='lines', name=column,
+                    hovertemplate='%{x|%m/%d %H:%M} - %{y:.2f}<extra></extra>'
+                ))
+            fig_roll.update_layout(
+                title=dict(text=f"{target} 이동 상관계수", font=dict(size=16)),
+                template="plotly_white", hovermode="x unified",
+                yaxis=dict(range=[-1, 1], title="상관계수"),
+                margin=dict(l=20, r=20, t=60, b=20), height=350
+            )
+            profiler.record_figure(fig_roll, chart="이동 상관계수")
+            with profiler.stage("plotly_chart", chart="이동 상관계수"):
+                st.plotly_chart(fig_roll, use_container_width=True)
+
+profiler.tab = None
+profiler.render_sidebar(st, PROFILE_DIR)
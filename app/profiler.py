@@ -0,0 +1,113 @@
+import os
+import json
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+SESSION_KEY = "_render_profile"
+
+
+def is_profiling_enabled(query_params=None):
+    """?profile=1 쿼리 파라미터 또는 LOAQUANT_PROFILE=1 환경변수로 활성화"""
+    if os.environ.get("LOAQUANT_PROFILE") == "1":
+        return True
+    if query_params is not None:
+        return str(query_params.get("profile", "")) == "1"
+    return False
+
+
+class RenderProfiler:
+    """대시보드 렌더링 단계별 소요 시간 및 브라우저 전송량 측정"""
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.records = []
+        self.tab = None
+        self.started = time.perf_counter()
+
+    def stage(self, name, chart=None, **counts):
+        if not self.enabled:
+            return nullcontext()
+        return self._timed(name, chart, counts)
+
+    @contextmanager
+    def _timed(self, name, chart, counts):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.records.append({
+                'tab': self.tab,
+                'chart': chart,
+                'stage': name,
+                'ms': round((time.perf_counter() - start) * 1000, 2),
+                **counts
+            })
+
+    def record_figure(self, fig, chart=None):
+        """Plotly Figure의 trace/데이터 포인트/도형 수 기록 (히트맵은 z 셀 수)"""
+        if not self.enabled:
+            return
+        import numpy as np
+
+        points = 0
+        for trace in fig.data:
+            if getattr(trace, 'z', None) is not None:
+                points += int(np.size(trace.z))
+            elif getattr(trace, 'x', None) is not None:
+                points += len(trace.x)
+        self.records.append({
+            'tab': self.tab,
+            'chart': chart,
+            'stage': 'figure_payload',
+            'ms': 0.0,
+            'traces': len(fig.data),
+            'points': points,
+            'shapes': len(fig.layout.shapes or ()),
+            'annotations': len(fig.layout.annotations or ())
+        })
+
+    def summary(self):
+        total_ms = round((time.perf_counter() - self.started) * 1000, 2)
+        return {'total_ms': total_ms, 'records': self.records}
+
+    def save(self, output_dir, summary=None):
+        os.makedirs(output_dir, exist_ok=True)
+        file_path = os.path.join(output_dir, f"profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump(summary or self.summary(), f, ensure_ascii=False, indent=2)
+        return file_path
+
+    def render_sidebar(self, st, output_dir):
+        if not self.enabled:
+            return
+        import pandas as pd
+
+        summary = self.summary()
+        # 저장 버튼 클릭은 새 실행을 일으키므로, 화면에 표시된 직전 실행의 기록을 세션에 보관해 저장
+        displayed = st.session_state.get(SESSION_KEY)
+        st.session_state[SESSION_KEY] = summary
+        with st.sidebar:
+            st.markdown("### 렌더링 프로파일")
+            st.metric("전체 렌더링", f"{summary['total_ms']:,.0f} ms")
+            if not self.records:
+                st.caption("기록된 단계가 없습니다.")
+                return
+
+            df = pd.DataFrame(self.records)
+            timed = df[df['stage'] != 'figure_payload']
+            st.markdown("**단계별 합계 (ms)**")
+            st.dataframe(timed.groupby('stage')['ms'].agg(['sum', 'count']).sort_values('sum', ascending=False))
+
+            payload = df[df['stage'] == 'figure_payload']
+            if not payload.empty:
+                count_cols = ['traces', 'points', 'shapes', 'annotations']
+                payload = payload.astype({c: int for c in count_cols})
+                st.markdown("**차트 전송량**")
+                st.dataframe(payload[['tab', 'chart', 'traces', 'points', 'shapes', 'annotations']], hide_index=True)
+
+            with st.expander("전체 기록"):
+                st.dataframe(df, hide_index=True)
+
+            if st.button("프로파일 저장"):
+                st.caption(f"저장됨: {self.save(output_dir, displayed)}")
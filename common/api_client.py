@@ -1,17 +1,38 @@
+import os
+import json
+import hashlib
 import requests
 import time
+from urllib.parse import urlparse
 from common.config_loader import load_api_key
 
+DEFAULT_BASE_URL = "https://developer-lostark.game.onstove.com"
+
+
+def request_key(method, path, payload=None):
+    """녹화/재생 파일 식별용 요청 키 (메서드 + 경로 + 정렬된 payload)"""
+    body = json.dumps(payload, sort_keys=True, ensure_ascii=False) if payload else ""
+    raw = f"{method} {path} {body}"
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
 
 class LostArkAPI:
-    def __init__(self):
-        self.api_key = load_api_key()
-        self.base_url = "https://developer-lostark.game.onstove.com"
+    def __init__(self, api_key=None, base_url=None, record_dir=None, replay_dir=None):
+        # replay 모드에서는 네트워크를 사용하지 않으므로 API 키가 필요 없음
+        if api_key is None and not replay_dir:
+            api_key = load_api_key()
+        self.api_key = api_key
+        self.base_url = base_url or os.environ.get("LOSTARK_API_BASE_URL", DEFAULT_BASE_URL)
+        self.record_dir = record_dir
+        self.replay_dir = replay_dir
         self.headers = {
             'accept': 'application/json',
             'authorization': f'bearer {self.api_key}',
             'content-type': 'application/json'
         }
+        self.stats = {'requests': 0, 'ok': 0, 'rate_limited': 0, 'errors': 0, 'replayed': 0, 'wait_sec': 0.0}
+        if record_dir:
+            os.makedirs(record_dir, exist_ok=True)
 
     def get_market_items(self, category_code, item_name=None, item_tier=None, item_grade=None, page_no=1,
                          sort_condition="ASC"):
@@ -42,18 +63,69 @@ class LostArkAPI:
 
         return self._send_request(url, payload)
 
-    def _send_request(self, url, payload):
+    def get_market_item_history(self, item_id):
+        # 최근 14일 일별 통계 (Date, AvgPrice, TradeCount)
+        url = f"{self.base_url}/markets/items/{item_id}"
+        return self._send_request(url, method="GET")
+
+    def _send_request(self, url, payload=None, method="POST"):
+        path = urlparse(url).path
+        if self.replay_dir:
+            return self._replay(method, path, payload)
+
         try:
-            response = requests.post(url, headers=self.headers, json=payload)
+            self.stats['requests'] += 1
+            if method == "GET":
+                response = requests.get(url, headers=self.headers)
+            else:
+                response = requests.post(url, headers=self.headers, json=payload)
             if response.status_code == 200:
-                return response.json()
+                self.stats['ok'] += 1
+                data = response.json()
+                if self.record_dir:
+                    self._record(method, path, payload, data)
+                return data
             elif response.status_code == 429:
-                print("Rate Limit 도달. 60초 대기")
-                time.sleep(60)
-                return self._send_request(url, payload)
+                self.stats['rate_limited'] += 1
+                wait = self._rate_limit_wait(response.headers)
+                print(f"Rate Limit 도달. {wait:.0f}초 대기")
+                self.stats['wait_sec'] += wait
+                time.sleep(wait)
+                return self._send_request(url, payload, method)
             else:
+                self.stats['errors'] += 1
                 print(f"API 오류 ({response.status_code}): {response.text}")
                 return None
         except Exception as e:
+            self.stats['errors'] += 1
             print(f"연결 실패: {e}")
-            return None
\ No newline at end of file
+            return None
+
+    @staticmethod
+    def _rate_limit_wait(headers, default=60):
+        # X-RateLimit-Reset(epoch 초) 기준으로 필요한 만큼만 대기
+        reset = headers.get('X-RateLimit-Reset')
+        if reset:
+            try:
+                return min(max(float(reset) - time.time(), 1), default)
+            except ValueError:
+                pass
+        retry_after = headers.get('Retry-After')
+        if retry_after and retry_after.isdigit():
+            return min(int(retry_after), default)
+        return default
+
+    def _record(self, method, path, payload, data):
+        record = {'method': method, 'path': path, 'payload': payload, 'body': data}
+        file_path = os.path.join(self.record_dir, f"{request_key(method, path, payload)}.json")
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump(record, f, ensure_ascii=False)
+
+    def _replay(self, method, path, payload):
+        file_path = os.path.join(self.replay_dir, f"{request_key(method, path, payload)}.json")
+        if not os.path.exists(file_path):
+            print(f"[Replay] 녹화된 응답 없음: {method} {path}")
+            return None
+        self.stats['replayed'] += 1
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return json.load(f)['body']
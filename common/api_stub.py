@@ -0,0 +1,197 @@
+import os
+import json
+import time
+import random
+import zlib
+import argparse
+import threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from common.api_client import request_key
+
+
+class StubConfig:
+    def __init__(self, record_dir=None, latency=0.0, jitter=0.0, rate_limit=None, window=60,
+                 error_rate=0.0, synthetic=True, seed=0):
+        self.record_dir = record_dir
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit = rate_limit
+        self.window = window
+        self.error_rate = error_rate
+        self.synthetic = synthetic
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.window_start = time.time()
+        self.window_count = 0
+        self.served = {'total': 0, 'recorded': 0, 'synthetic': 0, 'rate_limited': 0, 'errors': 0}
+        self.records = self._load_records()
+
+    def _load_records(self):
+        records = {}
+        if not self.record_dir or not os.path.isdir(self.record_dir):
+            return records
+        for file_name in os.listdir(self.record_dir):
+            if file_name.endswith('.json'):
+                with open(os.path.join(self.record_dir, file_name), 'r', encoding='utf-8') as f:
+                    records[file_name[:-5]] = json.load(f)['body']
+        return records
+
+    def take_rate_slot(self):
+        """고정 윈도우 방식 Rate Limit. 초과 시 윈도우 종료 시각(epoch) 반환"""
+        if not self.rate_limit:
+            return None
+        with self.lock:
+            now = time.time()
+            if now - self.window_start >= self.window:
+                self.window_start = now
+                self.window_count = 0
+            if self.window_count >= self.rate_limit:
+                return self.window_start + self.window
+            self.window_count += 1
+            return None
+
+
+# -----------------------------------------------------------------------------
+# 녹화된 응답이 없을 때 사용하는 합성 응답
+# -----------------------------------------------------------------------------
+def _synthetic_market_items(payload, pages=3, page_size=10):
+    code = payload.get('CategoryCode', 0)
+    page = payload.get('PageNo', 1)
+    name = payload.get('ItemName')
+    if name:
+        items = [{'Id': zlib.crc32(name.encode('utf-8')), 'Name': name, 'Grade': '일반', 'CurrentMinPrice': 100}]
+        return {'PageNo': page, 'PageSize': page_size, 'TotalCount': 1, 'Items': items if page == 1 else []}
+
+    items = []
+    if page <= pages:
+        for i in range(page_size):
+            items.append({
+                'Id': code * 1000 + page * page_size + i,
+                'Name': f"{code}-{page}-{i}",
+                'Grade': '일반',
+                'CurrentMinPrice': 10 + i
+            })
+    return {'PageNo': page, 'PageSize': page_size, 'TotalCount': pages * page_size, 'Items': items}
+
+
+def _synthetic_auction_items(payload):
+    items = [{'Name': payload.get('ItemName'), 'AuctionInfo': {'BuyPrice': 1000000 + i * 1000}} for i in range(10)]
+    return {'PageNo': 1, 'PageSize': 10, 'TotalCount': len(items), 'Items': items}
+
+
+def _synthetic_history(item_id):
+    today = datetime.now().date()
+    stats = [{'Date': (today - timedelta(days=d)).strftime('%Y-%m-%d'), 'AvgPrice': 100.0, 'TradeCount': 1000}
+             for d in range(14)]
+    return [{'Name': str(item_id), 'TradeRemainCount': None, 'Stats': stats}]
+
+
+def synthetic_response(method, path, payload):
+    if method == 'POST' and path == '/markets/items':
+        return _synthetic_market_items(payload or {})
+    if method == 'POST' and path == '/auctions/items':
+        return _synthetic_auction_items(payload or {})
+    if method == 'GET' and path.startswith('/markets/items/'):
+        return _synthetic_history(path.rsplit('/', 1)[-1])
+    return None
+
+
+# -----------------------------------------------------------------------------
+# HTTP 서버
+# -----------------------------------------------------------------------------
+def make_handler(config):
+    class StubHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            self._handle('GET', None)
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length', 0))
+            payload = json.loads(self.rfile.read(length) or b'null')
+            self._handle('POST', payload)
+
+        def _handle(self, method, payload):
+            config.served['total'] += 1
+            if config.latency or config.jitter:
+                time.sleep(config.latency + config.random.uniform(0, config.jitter))
+
+            reset_at = config.take_rate_slot()
+            if reset_at is not None:
+                config.served['rate_limited'] += 1
+                self._send(429, {'Message': 'API rate limit exceeded'}, {
+                    'X-RateLimit-Limit': str(config.rate_limit),
+                    'X-RateLimit-Remaining': '0',
+                    'X-RateLimit-Reset': str(int(reset_at) + 1),
+                    'Retry-After': str(max(int(reset_at - time.time()) + 1, 1))
+                })
+                return
+
+            if config.error_rate and config.random.random() < config.error_rate:
+                config.served['errors'] += 1
+                self._send(503, {'Message': 'Service Unavailable'})
+                return
+
+            body = config.records.get(request_key(method, self.path, payload))
+            if body is not None:
+                config.served['recorded'] += 1
+            elif config.synthetic:
+                body = synthetic_response(method, self.path, payload)
+                if body is not None:
+                    config.served['synthetic'] += 1
+            if body is None:
+                self._send(404, {'Message': 'Not recorded'})
+                return
+            self._send(200, body)
+
+        def _send(self, status, body, headers=None):
+            data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(data)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+    return StubHandler
+
+
+def start_stub_server(config=None, host='127.0.0.1', port=0):
+    """백그라운드 스레드로 스텁 서버 실행. (server, base_url) 반환"""
+    config = config or StubConfig()
+    server = ThreadingHTTPServer((host, port), make_handler(config))
+    server.config = config
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="로스트아크 API 로컬 스텁 서버")
+    parser.add_argument('--record-dir', default=None, help="LostArkAPI(record_dir=...)로 녹화한 응답 디렉터리")
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--latency', type=float, default=0.0, help="응답 지연 (초)")
+    parser.add_argument('--jitter', type=float, default=0.0, help="추가 무작위 지연 최대값 (초)")
+    parser.add_argument('--rate-limit', type=int, default=None, help="윈도우당 허용 요청 수")
+    parser.add_argument('--window', type=float, default=60, help="Rate Limit 윈도우 (초)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="503 응답 비율 (0~1)")
+    parser.add_argument('--no-synthetic', action='store_true', help="녹화되지 않은 요청은 404 응답")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    config = StubConfig(args.record_dir, args.latency, args.jitter, args.rate_limit, args.window,
+                        args.error_rate, not args.no_synthetic, args.seed)
+    server = ThreadingHTTPServer(('127.0.0.1', args.port), make_handler(config))
+    print(f"스텁 서버 실행: http://127.0.0.1:{args.port} (녹화 응답 {len(config.records)}건)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,13 @@
-from sqlalchemy import create_engine
 from common.config_loader import load_db_config
 
 
 def get_db_engine():
     config = load_db_config()
+    # GitHub Actions처럼 DB 없이 실행하는 경우 SQLAlchemy/드라이버를 로드하지 않음
+    if config.get('host') == 'skip':
+        return None
+
+    from sqlalchemy import create_engine
     db_url = f"mysql+pymysql://{config['user']}:{config['password']}@{config['host']}:{config['port']}/{config['database']}?charset=utf8mb4"
 
     try:
@@ -0,0 +1,56 @@
+import os
+import sys
+import argparse
+import subprocess
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure_imports(module):
+    """python -X importtime으로 모듈 import 비용 측정. [(모듈명, self_us, cumulative_us)] 반환"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=project_root, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    records = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        # 구분자 뒤 공백 1칸 제거, 나머지 들여쓰기는 import 깊이
+        records.append((name[1:].rstrip(), int(self_us), int(cumulative_us)))
+    return records
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="엔트리 포인트 import 시간 측정")
+    parser.add_argument('modules', nargs='+', help="측정할 모듈 (예: economy.data_collector)")
+    parser.add_argument('--top', type=int, default=10, help="출력할 상위 패키지 수")
+    parser.add_argument('--forbid', nargs='*', default=[], help="import되면 안 되는 패키지 (예: pandas sqlalchemy)")
+    args = parser.parse_args(argv)
+
+    failed = False
+    for module in args.modules:
+        records = measure_imports(module)
+        # 들여쓰기 2칸이 import 깊이 1단계. 깊이 0~1(엔트리 포인트가 직접 부르는 패키지)만 출력
+        target = next((cum for name, _, cum in records if name == module), 0)
+        shallow = [(name.strip(), cum) for name, _, cum in records
+                   if (len(name) - len(name.lstrip())) // 2 <= 1 and name.strip() != module]
+        loaded = {name.strip() for name, _, _ in records}
+
+        print(f"--- {module}: import {target / 1000:,.1f} ms ---")
+        for name, cum in sorted(shallow, key=lambda r: r[1], reverse=True)[:args.top]:
+            print(f"   {cum / 1000:8.1f} ms  {name}")
+
+        forbidden = [pkg for pkg in args.forbid if pkg in loaded]
+        if forbidden:
+            print(f"   -> [경고] 불필요한 패키지 import: {', '.join(forbidden)}")
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+import json
+import time
+import shutil
+import argparse
+import tempfile
+
+from common.api_client import LostArkAPI
+from common.api_stub import StubConfig, start_stub_server
+from economy.data_collector import collect_market_data
+
+
+def run_benchmark(record_dir=None, replay_dir=None, latency=0.0, jitter=0.0, rate_limit=None, window=60,
+                  error_rate=0.0, seed=0):
+    """스텁 서버(또는 재생 모드)를 대상으로 collect_market_data 1회 전체 실행 후 지표 반환"""
+    data_dir = tempfile.mkdtemp(prefix="loa_bench_")
+    server = None
+    try:
+        if replay_dir:
+            api = LostArkAPI(replay_dir=replay_dir)
+        else:
+            config = StubConfig(record_dir, latency, jitter, rate_limit, window, error_rate, True, seed)
+            server, base_url = start_stub_server(config)
+            api = LostArkAPI(api_key="stub", base_url=base_url)
+
+        start = time.perf_counter()
+        rows = collect_market_data(api=api, use_db=False, data_dir=data_dir)
+        elapsed = time.perf_counter() - start
+
+        stats = dict(api.stats)
+        stats['wait_sec'] = round(stats['wait_sec'], 3)
+        calls = stats['requests'] or stats['replayed']
+        result = {
+            'wall_sec': round(elapsed, 3),
+            'rows': len(rows),
+            'client': stats,
+            'rows_per_request': round(len(rows) / calls, 3) if calls else 0,
+            'success_ratio': round((stats['ok'] or stats['replayed']) / calls, 3) if calls else 0,
+            'rate_limit_wait_ratio': round(stats['wait_sec'] / elapsed, 3) if elapsed else 0,
+        }
+        if server:
+            result['server'] = dict(server.config.served)
+        return result
+    finally:
+        if server:
+            server.shutdown()
+            server.server_close()
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="collect_market_data 오프라인 벤치마크")
+    parser.add_argument('--record-dir', default=None, help="스텁 서버가 제공할 녹화 응답 디렉터리")
+    parser.add_argument('--replay-dir', default=None, help="서버 없이 LostArkAPI 재생 모드로 실행")
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--rate-limit', type=int, default=None)
+    parser.add_argument('--window', type=float, default=60)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=None, help="결과 JSON 저장 경로")
+    args = parser.parse_args(argv)
+
+    result = run_benchmark(args.record_dir, args.replay_dir, args.latency, args.jitter, args.rate_limit,
+                           args.window, args.error_rate, args.seed)
+
+    print("\n--- 벤치마크 결과 ---")
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
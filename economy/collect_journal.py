@@ -0,0 +1,93 @@
+import os
+import json
+from datetime import datetime
+
+JOURNAL_FILE_NAME = '.collect_journal.jsonl'
+
+
+class CollectionJournal:
+    """수집 배치 단위 체크포인트 (JSON Lines)
+
+    첫 줄은 수집 시각 헤더, 이후 배치가 끝날 때마다 한 줄씩 추가한다.
+    같은 수집 시각으로 재실행하면 기록된 배치는 API 호출 없이 재사용한다.
+    재개는 같은 정시 스케줄 안의 재시도(워크플로우의 1회 재시도)에만 허용하여,
+    지연·중단된 이전 실행의 저널이 다음 정시 수집을 대신하지 않도록 한다.
+    """
+
+    def __init__(self, data_path, run_at, max_age_minutes=15):
+        self.path = os.path.join(data_path, JOURNAL_FILE_NAME)
+        self.run_at = run_at
+        self.batches = {}
+        self.resumed = False
+
+        previous = self._load()
+        if previous and self._is_fresh(previous['run_at'], run_at, max_age_minutes):
+            self.run_at = previous['run_at']
+            self.batches = previous['batches']
+            self.resumed = True
+        else:
+            self._write_header()
+
+    @staticmethod
+    def _is_fresh(prev_run_at, run_at, max_age_minutes):
+        try:
+            prev = datetime.strptime(prev_run_at, '%Y-%m-%d %H:%M')
+            now = datetime.strptime(run_at, '%Y-%m-%d %H:%M')
+        except (TypeError, ValueError):
+            return False
+        same_hour = prev.replace(minute=0) == now.replace(minute=0)
+        return same_hour and 0 <= (now - prev).total_seconds() <= max_age_minutes * 60
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return None
+        run_at, batches = None, {}
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # 기록 도중 중단된 마지막 줄은 무시
+                    continue
+                if 'run_at' in entry:
+                    run_at = entry['run_at']
+                elif 'batch' in entry:
+                    batches[entry['batch']] = [self._decode(row) for row in entry['rows']]
+        return {'run_at': run_at, 'batches': batches} if run_at else None
+
+    def _write_header(self):
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'run_at': self.run_at}) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def has(self, key):
+        return key in self.batches
+
+    def get(self, key):
+        return self.batches[key]
+
+    def record(self, key, rows):
+        line = json.dumps({'batch': key, 'rows': [self._encode(row) for row in rows]}, ensure_ascii=False)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(line + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        self.batches[key] = rows
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    @staticmethod
+    def _encode(row):
+        row = dict(row)
+        if isinstance(row.get('collected_at'), datetime):
+            row['collected_at'] = row['collected_at'].isoformat()
+        return row
+
+    @staticmethod
+    def _decode(row):
+        if isinstance(row.get('collected_at'), str):
+            row['collected_at'] = datetime.fromisoformat(row['collected_at'])
+        return row
@@ -1,19 +1,19 @@
-import sys
 import os
+import csv
 import time
-import pandas as pd
 from datetime import datetime, timedelta, timezone
 
-current_dir = os.path.dirname(os.path.abspath(__file__))
-project_root = os.path.dirname(current_dir)
-sys.path.append(project_root)
-
 from common.api_client import LostArkAPI
 from common.db_connector import get_db_engine
+from economy.item_catalog import ItemCatalog, LIFE_SKILL_CATEGORIES, backfill_history
+from economy.collect_journal import CollectionJournal
+
+# pandas/SQLAlchemy는 DB 저장 시에만 지연 import (매시간 실행되는 수집기의 기동 시간 단축)
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 
-def ensure_data_dir():
-    data_path = os.path.join(project_root, 'data')
+def ensure_data_dir(data_path=None):
+    data_path = data_path or os.path.join(project_root, 'data')
     if not os.path.exists(data_path):
         os.makedirs(data_path)
     return data_path
@@ -25,46 +25,105 @@ def get_korea_time_str():
     return kst_now.strftime('%Y-%m-%d %H:%M')
 
 
-def update_wide_csv(new_data_list, file_name, current_time_col, category_col=None):
-    data_path = ensure_data_dir()
+def write_csv_atomic(header, rows, full_path):
+    # 임시 파일에 먼저 쓴 뒤 교체하여 중단 시에도 기존 CSV가 깨지지 않도록 함
+    tmp_path = full_path + '.tmp'
+    with open(tmp_path, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerow(header)
+        writer.writerows(rows)
+    os.replace(tmp_path, full_path)
+
+
+def update_wide_csv(new_data_list, file_name, current_time_col, category_col=None, data_path=None):
+    """wide CSV에 현재 시각 열 추가 (아이템 기준 outer merge, 표준 csv 모듈로 처리). 저장 성공 여부 반환"""
+    data_path = ensure_data_dir(data_path)
     full_path = os.path.join(data_path, file_name)
 
-    current_df = pd.DataFrame(new_data_list)
-    if current_df.empty:
-        return
+    if not new_data_list:
+        return True
     merge_keys = ['item_name']
-    cols_to_keep = ['item_name', 'current_min_price']
-
-    if category_col and category_col in current_df.columns:
+    if category_col and category_col in new_data_list[0]:
         merge_keys.append(category_col)
-        cols_to_keep.insert(1, category_col)
-
-    current_df = current_df.drop_duplicates(subset=merge_keys)
-    mini_df = current_df[cols_to_keep].copy()
-
-    mini_df.rename(columns={'current_min_price': current_time_col}, inplace=True)
 
     if os.path.exists(full_path):
         try:
-            old_df = pd.read_csv(full_path)
-            actual_merge_keys = [k for k in merge_keys if k in old_df.columns]
-
-            merged_df = pd.merge(old_df, mini_df, on=actual_merge_keys, how='outer')
-            merged_df.to_csv(full_path, index=False, encoding='utf-8-sig')
+            with open(full_path, 'r', newline='', encoding='utf-8-sig') as f:
+                reader = csv.reader(f)
+                header = next(reader)
+                old_rows = list(reader)
+
+            # 재개된 실행이 같은 시각 열을 다시 쓰는 경우 기존 열을 교체
+            if current_time_col in header:
+                drop_idx = header.index(current_time_col)
+                header = header[:drop_idx] + header[drop_idx + 1:]
+                old_rows = [row[:drop_idx] + row[drop_idx + 1:] for row in old_rows]
+
+            actual_merge_keys = [k for k in merge_keys if k in header]
+            key_idx = [header.index(k) for k in actual_merge_keys]
+            new_prices = {}
+            for item in new_data_list:
+                new_prices.setdefault(tuple(str(item[k]) for k in actual_merge_keys), item['current_min_price'])
+
+            merged_rows = []
+            for row in old_rows:
+                row = row + [''] * (len(header) - len(row))
+                price = new_prices.pop(tuple(row[i] for i in key_idx), None)
+                merged_rows.append(row + ['' if price is None else price])
+            for key, price in new_prices.items():
+                row = [''] * len(header)
+                for i, value in zip(key_idx, key):
+                    row[i] = value
+                merged_rows.append(row + [price])
+
+            merged_rows.sort(key=lambda r: tuple(r[i] for i in key_idx))
+            write_csv_atomic(header + [current_time_col], merged_rows, full_path)
             print(f"   -> [파일 저장] {file_name}")
         except Exception as e:
             print(f"   -> [Error] 병합 실패 ({file_name}): {e}")
+            return False
     else:
-        mini_df.to_csv(full_path, index=False, encoding='utf-8-sig')
+        rows, seen = [], set()
+        for item in new_data_list:
+            key = tuple(item[k] for k in merge_keys)
+            if key not in seen:
+                seen.add(key)
+                rows.append(list(key) + [item['current_min_price']])
+        try:
+            write_csv_atomic(merge_keys + [current_time_col], rows, full_path)
+        except Exception as e:
+            print(f"   -> [Error] 생성 실패 ({file_name}): {e}")
+            return False
         print(f"   -> [신규 생성] {file_name}")
+    return True
 
 
-def collect_market_data():
-    api = LostArkAPI()
-    engine = get_db_engine()
+def collect_market_data(api=None, use_db=True, data_dir=None):
+    # api/data_dir 지정 시 스텁 서버나 재생 모드로 오프라인 실행 가능 (economy.benchmark_collector)
+    api = api or LostArkAPI()
+    engine = get_db_engine() if use_db else None
+    data_path = ensure_data_dir(data_dir)
+    catalog = ItemCatalog(os.path.join(data_path, 'item_catalog.json'))
 
-    now_str = get_korea_time_str()
-    print(f"--- [{now_str} (KST)] 데이터 수집 시작 ---")
+    # 중단된 직전 실행이 있으면 같은 수집 시각으로 이어서 진행
+    journal = CollectionJournal(data_path, get_korea_time_str())
+    now_str = journal.run_at
+    if journal.resumed:
+        print(f"--- [{now_str} (KST)] 중단된 수집 재개 (완료 배치 {len(journal.batches)}개) ---")
+    else:
+        print(f"--- [{now_str} (KST)] 데이터 수집 시작 ---")
+
+    def run_batch(key, fetch_fn):
+        """배치 단위 수집. 저널에 있으면 재사용하고, 새로 수집한 결과는 즉시 기록"""
+        if journal.has(key):
+            print(f"   -> [체크포인트] {key} 건너뜀")
+            return journal.get(key)
+        rows = fetch_fn()
+        # 빈 결과(API 실패 등)는 기록하지 않아 재실행 시 다시 수집
+        if rows:
+            journal.record(key, rows)
+            catalog.save()
+        return rows
 
     data_materials = []
     data_lifeskill = []
@@ -75,24 +134,31 @@ def collect_market_data():
     # ---------------------------------------------------------
     # 1. 생활 재료
     # ---------------------------------------------------------
+    # 채집 계열은 세부 카테고리 단위로 탐색하므로 신규 티어도 자동으로 추적됨
+    # 제작 키트는 해당하는 세부 카테고리가 없어 이름 검색 유지
     life_skill_map = {
-        "식물채집": ["들꽃", "수줍은 들꽃", "화사한 들꽃", "아비도스 들꽃"],
-        "벌목": ["목재", "부드러운 목재", "튼튼한 목재", "아비도스 목재"],
-        "채광": ["철광석", "묵직한 철광석", "단단한 철광석", "아비도스 철광석"],
-        "수렵": ["진귀한 가죽", "두툼한 생고기", "수렵의 결정", "다듬은 생고기", "오레하 두툼한 생고기", "아비도스 두툼한 생고기"],
-        "낚시": ["낚시의 결정", "생선", "붉은 살 생선", "오레하 태양 잉어", "아비도스 태양 잉어"],
-        "고고학": ["진귀한 유물", "고고학의 결정", "고대 유물", "희귀한 유물", "오레하 유물", "아비도스 유물"],
         "기타": ["견습생용 제작 키트", "숙련가용 제작 키트", "도구 제작 부품", "전문가용 제작 키트", "초보자용 제작 키트", "달인용 제작 키트"]
     }
 
-    print(f"\n[생활 재료] 수집 중")
-    for category, items in life_skill_map.items():
+    def fetch_life_category(category_code, category):
+        return [{
+            'item_name': item['Name'],
+            'sub_category': category,
+            'item_grade': item['Grade'],
+            'item_tier': 3,
+            'current_min_price': item['CurrentMinPrice'],
+            'collected_at': datetime.now()
+        } for item in catalog.discover(api, category_code)]
+
+    def fetch_life_items(category, items):
+        rows = []
         for name in items:
             data = api.get_market_items(category_code=90000, item_name=name)
             if data and 'Items' in data:
                 for item in data['Items']:
                     if name == item['Name']:
-                        data_lifeskill.append({
+                        catalog.register(item, 90000)
+                        rows.append({
                             'item_name': item['Name'],
                             'sub_category': category,
                             'item_grade': item['Grade'],
@@ -101,6 +167,15 @@ def collect_market_data():
                             'collected_at': datetime.now()
                         })
             time.sleep(0.12)
+        return rows
+
+    print(f"\n[생활 재료] 수집 중")
+    for category_code, category in LIFE_SKILL_CATEGORIES.items():
+        data_lifeskill += run_batch(f"lifeskill:{category_code}",
+                                    lambda: fetch_life_category(category_code, category))
+
+    for category, items in life_skill_map.items():
+        data_lifeskill += run_batch(f"lifeskill:{category}", lambda: fetch_life_items(category, items))
 
     # ---------------------------------------------------------
     # 2. 강화 재료 (T4/T3)
@@ -138,63 +213,81 @@ def collect_market_data():
         "야금술 : 업화 [19-20]"
     ]
 
-    def fetch_market_items(target_list, result_list, category_code=50000, tier_val=None):
-        print(f"\n[강화 재료] 수집 중 ({target_list[0]} 등)")
-        for name in target_list:
-            data = api.get_market_items(category_code, item_name=name, item_tier=tier_val)
-            if data and 'Items' in data:
-                for item in data['Items']:
-                    if name in item['Name']:
-                        result_list.append({
-                            'item_name': item['Name'],
-                            'item_grade': item['Grade'],
-                            'item_tier': tier_val if tier_val else 3,
-                            'current_min_price': item['CurrentMinPrice'],
-                            'collected_at': datetime.now()
-                        })
-            time.sleep(0.12)
-
-    fetch_market_items(items_t4, data_materials, 50000, 4)
-    fetch_market_items(items_t3, data_materials, 50000, 3)
-    fetch_market_items(items_special, data_materials, 50000, None)
+    def fetch_materials(tier_val, target_list):
+        # 이름별 검색 대신 티어 단위로 카테고리 전체를 탐색 (신규 아이템/ItemId가 카탈로그에 자동 반영)
+        print(f"\n[강화 재료] T{tier_val} 수집 중")
+        result_list = []
+        for item in catalog.discover(api, 50000, item_tier=tier_val, register=False):
+            if any(name in item['Name'] for name in target_list):
+                item_tier = tier_val
+            elif any(name in item['Name'] for name in items_special):
+                item_tier = 3
+            else:
+                continue
+            # 추적 대상만 등록하여 백필 대상에 포함
+            catalog.register(item, 50000)
+            result_list.append({
+                'item_name': item['Name'],
+                'item_grade': item['Grade'],
+                'item_tier': item_tier,
+                'current_min_price': item['CurrentMinPrice'],
+                'collected_at': datetime.now()
+            })
+        return result_list
+
+    # 특수 재료(재봉술/야금술)는 T3/T4 탐색 결과에 함께 포함됨
+    data_materials += run_batch("materials:t4", lambda: fetch_materials(4, items_t4))
+    data_materials += run_batch("materials:t3", lambda: fetch_materials(3, items_t3))
 
     # ---------------------------------------------------------
     # 3. 배틀 아이템
     # ---------------------------------------------------------
-    print(f"\n[배틀 아이템] 수집 중")
-    # 배틀 아이템(Category: 60000) 전체 페이지 순회
-    for page in range(1, 20):
-        b_data = api.get_market_items(category_code=60000, page_no=page)
-
-        if b_data and 'Items' in b_data and len(b_data['Items']) > 0:
-            for item in b_data['Items']:
-                data_battle.append({
-                    'item_name': item['Name'],
-                    'current_min_price': item['CurrentMinPrice'],
-                    'collected_at': datetime.now()
-                })
-            time.sleep(0.12)
-        else:
-            break
+    def fetch_battle_items():
+        print(f"\n[배틀 아이템] 수집 중")
+        rows = []
+        # 배틀 아이템(Category: 60000) 전체 페이지 순회
+        for page in range(1, 20):
+            b_data = api.get_market_items(category_code=60000, page_no=page)
+
+            if b_data and 'Items' in b_data and len(b_data['Items']) > 0:
+                for item in b_data['Items']:
+                    catalog.register(item, 60000)
+                    rows.append({
+                        'item_name': item['Name'],
+                        'current_min_price': item['CurrentMinPrice'],
+                        'collected_at': datetime.now()
+                    })
+                time.sleep(0.12)
+            else:
+                break
+        return rows
+
+    data_battle += run_batch("battle", fetch_battle_items)
 
     # ---------------------------------------------------------
     # 4. 각인서
     # ---------------------------------------------------------
-    print(f"\n[각인서] 수집 중")
-    for page in range(1, 11):
-        eng_data = api.get_market_items(40000, item_grade="유물", page_no=page, sort_condition="DESC")
-        if eng_data and 'Items' in eng_data:
-            for item in eng_data['Items']:
-                data_engravings.append({
-                    'item_name': item['Name'],
-                    'item_grade': item['Grade'],
-                    'item_tier': 3,
-                    'current_min_price': item['CurrentMinPrice'],
-                    'collected_at': datetime.now()
-                })
-            time.sleep(0.2)
-        else:
-            break
+    def fetch_engravings():
+        print(f"\n[각인서] 수집 중")
+        rows = []
+        for page in range(1, 11):
+            eng_data = api.get_market_items(40000, item_grade="유물", page_no=page, sort_condition="DESC")
+            if eng_data and 'Items' in eng_data:
+                for item in eng_data['Items']:
+                    catalog.register(item, 40000)
+                    rows.append({
+                        'item_name': item['Name'],
+                        'item_grade': item['Grade'],
+                        'item_tier': 3,
+                        'current_min_price': item['CurrentMinPrice'],
+                        'collected_at': datetime.now()
+                    })
+                time.sleep(0.2)
+            else:
+                break
+        return rows
+
+    data_engravings += run_batch("engravings", fetch_engravings)
 
     # ---------------------------------------------------------
     # 5. 보석 (T4 8~10레벨)
@@ -203,26 +296,32 @@ def collect_market_data():
         "8레벨 겁화의 보석", "9레벨 겁화의 보석", "10레벨 겁화의 보석",
         "8레벨 작열의 보석", "9레벨 작열의 보석", "10레벨 작열의 보석"
     ]
-    print(f"\[보석] 경매장 시세 수집 중")
-    for gem_name in target_gems:
-        data = api.get_auction_items(category_code=210000, item_name=gem_name, item_tier=4)
-        if data and 'Items' in data:
-            min_price = None
-            for auction_item in data['Items']:
-                buy_price = auction_item.get('AuctionInfo', {}).get('BuyPrice')
-                if buy_price:
-                    if min_price is None or buy_price < min_price:
-                        min_price = buy_price
-
-            if min_price:
-                data_gems.append({
-                    'item_name': gem_name,
-                    'item_grade': '고대',
-                    'item_tier': 4,
-                    'current_min_price': min_price,
-                    'collected_at': datetime.now()
-                })
-        time.sleep(0.3)
+
+    def fetch_gems():
+        print(f"\n[보석] 경매장 시세 수집 중")
+        rows = []
+        for gem_name in target_gems:
+            data = api.get_auction_items(category_code=210000, item_name=gem_name, item_tier=4)
+            if data and 'Items' in data:
+                min_price = None
+                for auction_item in data['Items']:
+                    buy_price = auction_item.get('AuctionInfo', {}).get('BuyPrice')
+                    if buy_price:
+                        if min_price is None or buy_price < min_price:
+                            min_price = buy_price
+
+                if min_price:
+                    rows.append({
+                        'item_name': gem_name,
+                        'item_grade': '고대',
+                        'item_tier': 4,
+                        'current_min_price': min_price,
+                        'collected_at': datetime.now()
+                    })
+            time.sleep(0.3)
+        return rows
+
+    data_gems += run_batch("gems", fetch_gems)
 
     # ---------------------------------------------------------
     # 6. 저장 (DB & CSV)
@@ -230,23 +329,45 @@ def collect_market_data():
 
     # CSV 저장
     print("\nCSV 파일 업데이트")
-    if data_materials: update_wide_csv(data_materials, "market_materials.csv", now_str)
-    if data_lifeskill: update_wide_csv(data_lifeskill, "market_lifeskill.csv", now_str, category_col="sub_category")
-    if data_battle: update_wide_csv(data_battle, "market_battleitems.csv", now_str)
-    if data_engravings: update_wide_csv(data_engravings, "market_engravings.csv", now_str)
-    if data_gems: update_wide_csv(data_gems, "market_gems.csv", now_str)
+    saved = [
+        update_wide_csv(data_materials, "market_materials.csv", now_str, data_path=data_path),
+        update_wide_csv(data_lifeskill, "market_lifeskill.csv", now_str, category_col="sub_category", data_path=data_path),
+        update_wide_csv(data_battle, "market_battleitems.csv", now_str, data_path=data_path),
+        update_wide_csv(data_engravings, "market_engravings.csv", now_str, data_path=data_path),
+        update_wide_csv(data_gems, "market_gems.csv", now_str, data_path=data_path),
+    ]
 
     # DB 저장
     all_rows = data_materials + data_lifeskill + data_battle + data_engravings + data_gems
-    if all_rows and engine:
+    if all_rows and engine and journal.has("saved:db"):
+        # CSV는 같은 시각 열을 교체하므로 다시 써도 되지만 DB는 append이므로 재개 시 건너뜀
+        print("\n   -> [체크포인트] DB 저장 건너뜀")
+    elif all_rows and engine:
         try:
+            import pandas as pd
             df_db = pd.DataFrame(all_rows)
             df_db.to_sql(name='market_prices', con=engine, if_exists='append', index=False)
+            journal.record("saved:db", [])
             print(f"\nDB 저장 완료: 총 {len(df_db)}건")
         except Exception as e:
             print(f"DB 저장 실패: {e}")
+            saved.append(False)
+
+    # 모든 저장이 성공한 경우에만 체크포인트 정리 (실패 시 재실행에서 저널로 다시 저장)
+    if all(saved):
+        journal.clear()
+
+    # 신규 아이템 히스토리 백필 (미완료분은 다음 실행에서 이어서 수집)
+    catalog.save()
+    if catalog.new_items:
+        print(f"\n신규 아이템 {len(catalog.new_items)}개 발견")
+    backfill_history(api, catalog, stats_path=os.path.join(data_path, 'market_daily_stats.csv'))
 
+    if not all(saved):
+        # 종료 코드로 실패를 알려 워크플로우의 재시도가 체크포인트로 저장을 다시 수행하도록 함
+        raise RuntimeError("저장 실패가 있어 체크포인트 유지 (재실행 시 저장 재시도)")
     print("\n모든 작업 완료.")
+    return all_rows
 
 
 if __name__ == "__main__":
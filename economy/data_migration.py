@@ -0,0 +1,396 @@
+import sys
+import os
+import json
+import argparse
+import pandas as pd
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LONG_COLUMNS = ['item_name', 'sub_category', 'collected_at', 'current_min_price']
+ID_COLUMNS = ['item_name', 'sub_category']
+KEY_COLUMNS = ['item_name', 'sub_category', 'collected_at']
+DEFAULT_TABLE = 'market_prices'
+PROGRESS_TABLE = '_migrate_progress'
+DEFAULT_CHUNKSIZE = {'wide': 50, 'long': 100000, 'db': 100000}
+
+
+# -----------------------------------------------------------------------------
+# 1. 읽기 (청크 단위 long 포맷 DataFrame 생성)
+# -----------------------------------------------------------------------------
+def iter_wide_csv(path, chunksize=50):
+    """wide CSV(행=아이템, 열=수집시각)를 아이템 chunksize개 단위로 long 포맷 변환"""
+    for chunk in pd.read_csv(path, chunksize=chunksize, encoding='utf-8-sig'):
+        id_cols = [c for c in ID_COLUMNS if c in chunk.columns]
+        long_df = chunk.melt(id_vars=id_cols, var_name='collected_at', value_name='current_min_price')
+        long_df = long_df.dropna(subset=['current_min_price'])
+        yield _normalize_long(long_df)
+
+
+def iter_long_csv(path, chunksize=100000):
+    for chunk in pd.read_csv(path, chunksize=chunksize, encoding='utf-8-sig'):
+        yield _normalize_long(chunk)
+
+
+def iter_db(engine, table=DEFAULT_TABLE, chunksize=100000):
+    """서버 측 커서로 chunksize행씩 읽음. 재개 시 청크 경계가 같도록 키 전체로 정렬"""
+    cols = ', '.join(LONG_COLUMNS)
+    query = f"SELECT {cols} FROM {table} ORDER BY collected_at, item_name, sub_category"
+    with engine.connect().execution_options(stream_results=True) as conn:
+        for chunk in pd.read_sql(query, con=conn, chunksize=chunksize):
+            yield _normalize_long(chunk)
+
+
+def _normalize_long(df):
+    df = df.copy()
+    if 'sub_category' not in df.columns:
+        df['sub_category'] = None
+    df['collected_at'] = pd.to_datetime(df['collected_at'], errors='coerce').dt.strftime('%Y-%m-%d %H:%M')
+    df = df.dropna(subset=['collected_at', 'current_min_price'])
+    return df[LONG_COLUMNS]
+
+
+def _key_frame(df):
+    """중복 판정 키 (아이템, 분류, 수집시각 분 단위)"""
+    keys = df[KEY_COLUMNS].copy()
+    keys['sub_category'] = keys['sub_category'].fillna('').astype(str)
+    keys['collected_at'] = pd.to_datetime(keys['collected_at'], errors='coerce').dt.strftime('%Y-%m-%d %H:%M')
+    return keys
+
+
+# -----------------------------------------------------------------------------
+# 2. 쓰기
+# -----------------------------------------------------------------------------
+class LongCsvWriter:
+    """long 포맷 CSV에 청크를 이어 붙임. 재개 시 마지막 체크포인트 위치로 잘라냄"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def position(self):
+        return os.path.getsize(self.path) if os.path.exists(self.path) else 0
+
+    def new_rows(self, df):
+        return df
+
+    def rollback(self, position):
+        if os.path.exists(self.path) and os.path.getsize(self.path) > position:
+            with open(self.path, 'r+b') as f:
+                f.truncate(position)
+
+    def write(self, df, progress=None):
+        if df.empty:
+            return
+        is_new = self.position() == 0
+        df.to_csv(self.path, mode='a', header=is_new, index=False,
+                  encoding='utf-8-sig' if is_new else 'utf-8')
+
+    def close(self):
+        pass
+
+    def count(self):
+        if not os.path.exists(self.path):
+            return 0
+        return sum(len(c) for c in pd.read_csv(self.path, chunksize=100000, usecols=['item_name']))
+
+
+class WideCsvWriter:
+    """long 청크를 wide 포맷으로 누적. 출력 크기는 wide 결과물 자체로 제한됨"""
+
+    def __init__(self, path):
+        self.path = path
+        self.wide_df = None
+        self.id_cols = None
+
+    def position(self):
+        return 0
+
+    def new_rows(self, df):
+        return df
+
+    def rollback(self, position):
+        # wide 결과는 close() 시점에만 기록되므로 재개 시 처음부터 다시 누적
+        self.wide_df = None
+
+    def write(self, df, progress=None):
+        if df.empty:
+            return
+        if self.id_cols is None:
+            self.id_cols = ['item_name', 'sub_category'] if df['sub_category'].notna().any() else ['item_name']
+        pivot = df.pivot_table(index=self.id_cols, columns='collected_at', values='current_min_price', aggfunc='last')
+        self.wide_df = pivot if self.wide_df is None else self.wide_df.combine_first(pivot)
+
+    def close(self):
+        if self.wide_df is None:
+            return
+        wide_df = self.wide_df.reindex(columns=sorted(self.wide_df.columns)).reset_index()
+        tmp_path = self.path + '.tmp'
+        wide_df.to_csv(tmp_path, index=False, encoding='utf-8-sig')
+        os.replace(tmp_path, self.path)
+
+    def count(self):
+        if not os.path.exists(self.path):
+            return 0
+        return sum(int(c.iloc[:, len(_wide_id_cols(c)):].notna().sum().sum())
+                   for c in pd.read_csv(self.path, chunksize=50, encoding='utf-8-sig'))
+
+
+class DbWriter:
+    """DB 테이블에 청크를 추가. 이미 있는 행은 건너뛰고, 진행 기록은 같은 트랜잭션으로 PROGRESS_TABLE에 저장"""
+
+    def __init__(self, engine, table=DEFAULT_TABLE):
+        self.engine = engine
+        self.table = table
+
+    def position(self):
+        return 0
+
+    def new_rows(self, df):
+        """대상 테이블(수집기가 적재했을 수 있음)에 같은 키가 없는 행만 반환"""
+        df = df.drop_duplicates(subset=KEY_COLUMNS, keep='last')
+        existing = self.existing_keys(df)
+        if existing.empty:
+            return df
+        keys = _key_frame(df)
+        found = keys.reset_index().merge(existing, on=KEY_COLUMNS)['index']
+        return df.drop(index=found)
+
+    def existing_keys(self, df):
+        """청크의 아이템/수집시각 범위에 해당하는 대상 테이블의 키 (분 단위 정규화)"""
+        from sqlalchemy import text
+
+        if df.empty or not self._has_table(self.table):
+            return pd.DataFrame(columns=KEY_COLUMNS)
+        names = sorted(df['item_name'].unique())
+        params = {f"n{i}": name for i, name in enumerate(names)}
+        params['start'] = df['collected_at'].min()
+        params['end'] = df['collected_at'].max() + ':59.999999'
+        query = text(f"SELECT {', '.join(KEY_COLUMNS)} FROM {self.table} "
+                     f"WHERE collected_at >= :start AND collected_at <= :end "
+                     f"AND item_name IN ({', '.join(':n' + str(i) for i in range(len(names)))})")
+        return _key_frame(pd.read_sql(query, con=self.engine, params=params)).drop_duplicates()
+
+    def rollback(self, position):
+        pass
+
+    def write(self, df, progress=None):
+        # 데이터와 진행 기록을 한 트랜잭션으로 커밋: 중단 시점과 무관하게 재개 위치가 실제 기록과 일치
+        from sqlalchemy import text
+
+        with self.engine.begin() as conn:
+            if not df.empty:
+                # 수집기가 적재하는 열과 같은 DATETIME 형식으로 기록
+                df = df.assign(collected_at=pd.to_datetime(df['collected_at']))
+                df.to_sql(name=self.table, con=conn, if_exists='append', index=False)
+            if progress is not None:
+                conn.execute(text(f"CREATE TABLE IF NOT EXISTS {PROGRESS_TABLE} "
+                                  "(job VARCHAR(255) PRIMARY KEY, progress TEXT)"))
+                conn.execute(text(f"DELETE FROM {PROGRESS_TABLE} WHERE job = :job"), {'job': self.table})
+                conn.execute(text(f"INSERT INTO {PROGRESS_TABLE} (job, progress) VALUES (:job, :progress)"),
+                             {'job': self.table, 'progress': json.dumps(progress)})
+
+    def committed_progress(self):
+        """DB에 커밋된 진행 기록 (없으면 None)"""
+        from sqlalchemy import text
+
+        if not self._has_table(PROGRESS_TABLE):
+            return None
+        with self.engine.connect() as conn:
+            row = conn.execute(text(f"SELECT progress FROM {PROGRESS_TABLE} WHERE job = :job"),
+                               {'job': self.table}).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def clear_progress(self):
+        from sqlalchemy import text
+
+        if self._has_table(PROGRESS_TABLE):
+            with self.engine.begin() as conn:
+                conn.execute(text(f"DELETE FROM {PROGRESS_TABLE} WHERE job = :job"), {'job': self.table})
+
+    def close(self):
+        pass
+
+    def count(self):
+        if not self._has_table(self.table):
+            return 0
+        return int(pd.read_sql(f"SELECT COUNT(*) AS cnt FROM {self.table}", con=self.engine)['cnt'].iloc[0])
+
+    def _has_table(self, table):
+        from sqlalchemy import inspect
+        return inspect(self.engine).has_table(table)
+
+
+def _wide_id_cols(df):
+    return [c for c in ID_COLUMNS if c in df.columns]
+
+
+# -----------------------------------------------------------------------------
+# 3. 이관 (체크포인트 기반 재개 + 건수 검증)
+# -----------------------------------------------------------------------------
+def _new_progress(source_id=None, chunksize=None):
+    return {'chunks_done': 0, 'rows_written': 0, 'rows_skipped': 0, 'position': 0,
+            'source': source_id, 'chunksize': chunksize}
+
+
+def _load_progress(progress_path):
+    if not os.path.exists(progress_path):
+        return None
+    with open(progress_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _save_progress(progress_path, progress):
+    tmp_path = progress_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(progress, f)
+    os.replace(tmp_path, progress_path)
+
+
+def _saved_progress(writer, progress_path):
+    """재개할 진행 기록. DB 대상은 데이터와 함께 커밋된 기록을 우선 사용"""
+    if isinstance(writer, DbWriter):
+        committed = writer.committed_progress()
+        if committed is not None:
+            return committed
+    return _load_progress(progress_path)
+
+
+def _clear_progress(writer, progress_path):
+    if isinstance(writer, DbWriter):
+        writer.clear_progress()
+    if os.path.exists(progress_path):
+        os.remove(progress_path)
+
+
+def migrate(chunks, writer, progress_path, progress=None):
+    """청크 스트림을 writer로 이관. 청크마다 진행 상황을 기록해 중단 시 이어서 실행"""
+    progress = dict(progress or _new_progress())
+    # wide 출력은 종료 시점에만 기록되므로 부분 재개가 불가능
+    if isinstance(writer, WideCsvWriter):
+        progress.update(chunks_done=0, rows_written=0, rows_skipped=0, position=0)
+    writer.rollback(progress['position'])
+
+    if progress['chunks_done']:
+        print(f"   -> [재개] {progress['chunks_done']}번째 청크 이후부터 진행")
+
+    for idx, chunk in enumerate(chunks):
+        if idx < progress['chunks_done']:
+            continue
+        rows = writer.new_rows(chunk)
+        progress['chunks_done'] = idx + 1
+        progress['rows_written'] += len(rows)
+        progress['rows_skipped'] = progress.get('rows_skipped', 0) + len(chunk) - len(rows)
+        writer.write(rows, progress)
+        progress['position'] = writer.position()
+        _save_progress(progress_path, progress)
+        print(f"   -> 청크 {idx + 1} 완료 (누적 {progress['rows_written']}건, 기존 행 건너뜀 {progress['rows_skipped']}건)")
+
+    writer.close()
+    return progress['rows_written']
+
+
+def verify(chunks, writer):
+    """원본 행이 대상에 모두 있는지 확인
+
+    DB 대상은 기존 행과 합쳐지므로 전체 건수 대신 원본의 고유 키가 대상에 모두 존재하는지 비교한다.
+    """
+    if isinstance(writer, DbWriter):
+        source_rows, target_rows = 0, 0
+        for chunk in chunks:
+            keys = _key_frame(chunk).drop_duplicates()
+            source_rows += len(keys)
+            target_rows += len(keys.merge(writer.existing_keys(chunk), on=KEY_COLUMNS))
+    else:
+        source_rows, target_rows = count_source(chunks), writer.count()
+
+    if target_rows == source_rows:
+        print(f"[검증 성공] {source_rows}건 일치")
+        return True
+    print(f"[검증 실패] 원본 {source_rows}건 / 대상 {target_rows}건")
+    return False
+
+
+def count_source(chunks):
+    return sum(len(c) for c in chunks)
+
+
+# -----------------------------------------------------------------------------
+# 4. CLI
+# -----------------------------------------------------------------------------
+def _open_source(kind, path, chunksize):
+    if kind == 'wide':
+        return lambda: iter_wide_csv(path, chunksize)
+    if kind == 'long':
+        return lambda: iter_long_csv(path, chunksize)
+    if kind == 'db':
+        engine = _get_engine()
+        return lambda: iter_db(engine, path or DEFAULT_TABLE, chunksize)
+    raise ValueError(f"알 수 없는 형식: {kind}")
+
+
+def _open_writer(kind, path):
+    if kind == 'wide':
+        return WideCsvWriter(path)
+    if kind == 'long':
+        return LongCsvWriter(path)
+    if kind == 'db':
+        return DbWriter(_get_engine(), path or DEFAULT_TABLE)
+    raise ValueError(f"알 수 없는 형식: {kind}")
+
+
+def _get_engine():
+    from common.db_connector import get_db_engine
+    engine = get_db_engine()
+    if engine is None:
+        raise RuntimeError("DB 엔진 생성 실패")
+    return engine
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="wide CSV / long CSV / DB 간 청크 단위 데이터 이관")
+    parser.add_argument('src_kind', choices=['wide', 'long', 'db'])
+    parser.add_argument('src', help="원본 경로 (db인 경우 테이블명)")
+    parser.add_argument('dst_kind', choices=['wide', 'long', 'db'])
+    parser.add_argument('dst', help="대상 경로 (db인 경우 테이블명)")
+    parser.add_argument('--chunksize', type=int, default=None)
+    parser.add_argument('--restart', action='store_true', help="진행 기록을 무시하고 처음부터 실행")
+    parser.add_argument('--no-verify', action='store_true')
+    args = parser.parse_args(argv)
+
+    chunksize = args.chunksize or DEFAULT_CHUNKSIZE[args.src_kind]
+    source = _open_source(args.src_kind, args.src, chunksize)
+    writer = _open_writer(args.dst_kind, args.dst)
+    source_id = f"{args.src_kind}:{args.src if args.src_kind == 'db' else os.path.abspath(args.src)}"
+    progress_path = os.path.join(project_root, 'data', f".migrate_{os.path.basename(args.dst)}.progress.json")
+
+    # DB 대상은 기존 행을 건너뛰므로 --restart로 처음부터 다시 실행해도 중복되지 않음
+    progress = _saved_progress(writer, progress_path)
+    if progress and not args.restart:
+        if progress.get('source') != source_id:
+            print(f"[중단] 진행 기록의 원본({progress.get('source')})이 현재 원본({source_id})과 다릅니다. "
+                  f"--restart로 처음부터 실행하세요.")
+            return 1
+        # 청크 크기가 다르면 완료된 청크 수로 건너뛸 행이 달라짐
+        if progress.get('chunksize') != chunksize:
+            print(f"[중단] 진행 기록의 청크 크기({progress.get('chunksize')})가 현재 값({chunksize})과 다릅니다. "
+                  f"같은 --chunksize로 이어서 실행하거나 --restart로 처음부터 실행하세요.")
+            return 1
+
+    if args.restart or not progress:
+        if isinstance(writer, LongCsvWriter) and os.path.exists(args.dst):
+            os.remove(args.dst)
+        progress = _new_progress(source_id, chunksize)
+        _save_progress(progress_path, progress)
+
+    print(f"--- [{args.src_kind}] {args.src} -> [{args.dst_kind}] {args.dst} ---")
+    migrate(source(), writer, progress_path, progress)
+    # 전체 청크를 기록했으면 검증 결과와 무관하게 진행 기록 삭제 (실패한 결과를 이어서 실행하지 않도록)
+    _clear_progress(writer, progress_path)
+
+    ok = True
+    if not args.no_verify:
+        ok = verify(source(), writer)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,249 @@
+import os
+import sys
+import json
+import time
+import argparse
+import warnings
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DATA_DIR = os.path.join(project_root, 'data')
+FORECAST_DIR = os.path.join(DATA_DIR, 'forecast')
+MODEL_CACHE_FILE = os.path.join(FORECAST_DIR, 'models.json')
+FORECAST_FILE = os.path.join(FORECAST_DIR, 'forecasts.csv')
+
+SOURCE_FILES = [
+    "market_materials.csv", "market_lifeskill.csv", "market_battleitems.csv",
+    "market_engravings.csv", "market_gems.csv"
+]
+
+SEASONAL_PERIODS = 24       # 1시간 간격 기준 하루 주기 (06시 초기화 포함)
+HORIZON = 24                # 예측 구간 (시간)
+HISTORY_LIMIT = 24 * 28     # 적합에 사용할 최근 데이터 수
+REFIT_AFTER = 24            # 새 데이터가 이만큼 쌓이면 파라미터 재최적화
+MIN_POINTS = 2 * SEASONAL_PERIODS
+
+
+# -----------------------------------------------------------------------------
+# 1. 시계열 준비
+# -----------------------------------------------------------------------------
+def load_hourly_series(data_dir=DATA_DIR):
+    """wide CSV를 아이템별 1시간 간격 시계열로 변환 ({(파일, 아이템): Series})"""
+    series = {}
+    for file_name in SOURCE_FILES:
+        path = os.path.join(data_dir, file_name)
+        if not os.path.exists(path):
+            continue
+        df = pd.read_csv(path).drop(columns=['sub_category'], errors='ignore')
+        df = df.drop_duplicates(subset=['item_name']).set_index('item_name').T
+        df.index = pd.to_datetime(df.index, errors='coerce')
+        df = df[df.index.notnull()].apply(pd.to_numeric, errors='coerce').sort_index()
+        # 수집 시각이 불규칙하므로 정시 단위로 맞춘 뒤 짧은 결측만 보간
+        hourly = df.resample('h').mean().interpolate(limit=6, limit_area='inside')
+        for item in hourly.columns:
+            s = hourly[item]
+            if s.first_valid_index() is None:
+                continue
+            # 긴 결측 구간은 직전 가격 유지 (ETS는 등간격 시계열 필요)
+            s = s.loc[s.first_valid_index():s.last_valid_index()].ffill()
+            # 캐시 경로는 적합 시작 시점부터 다시 계산하므로 재최적화 주기만큼 여유를 둠
+            series[(file_name, item)] = s.iloc[-(HISTORY_LIMIT + REFIT_AFTER):]
+    return series
+
+
+# -----------------------------------------------------------------------------
+# 2. 모델 적합 (프로세스 풀 작업 단위)
+# -----------------------------------------------------------------------------
+def fit_item(task):
+    """ETS 적합 후 예측. 실패한 아이템은 (key, 오류 메시지)만 반환해 배치 전체가 중단되지 않도록 함"""
+    try:
+        return _fit_item(*task)
+    except Exception as e:
+        return task[0], f"{type(e).__name__}: {e}"
+
+
+def _fit_item(key, values, index, cached_params):
+    """cached_params가 있으면 평활 파라미터와 추정된 초기 상태를 고정하고 새 데이터로 상태만 갱신
+
+    초기 상태까지 고정하므로 데이터가 같으면 전체 적합과 같은 모델이 된다 (check_cached_fit).
+    """
+    from statsmodels.tsa.holtwinters import ExponentialSmoothing
+
+    s = pd.Series(values, index=pd.DatetimeIndex(index, freq='h'))
+    seasonal = 'add' if len(s) >= MIN_POINTS else None
+    cached = cached_params if cached_params and cached_params.get('seasonal') == seasonal \
+        and cached_params.get('initial') else None
+
+    init = {'initialization_method': 'known', **cached['initial']} if cached else {'initialization_method': 'estimated'}
+    model = ExponentialSmoothing(
+        s, trend='add', damped_trend=True, seasonal=seasonal,
+        seasonal_periods=SEASONAL_PERIODS if seasonal else None, **init
+    )
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        if cached:
+            fitted = model.fit(**cached['params'], optimized=False)
+        else:
+            fitted = model.fit()
+
+    params = {
+        name: float(fitted.params[name])
+        for name in ('smoothing_level', 'smoothing_trend', 'smoothing_seasonal', 'damping_trend')
+        if fitted.params.get(name) is not None and not pd.isna(fitted.params.get(name))
+    }
+    initial = {'initial_level': float(fitted.params['initial_level']),
+               'initial_trend': float(fitted.params['initial_trend'])}
+    if seasonal:
+        initial['initial_seasonal'] = [float(v) for v in fitted.params['initial_seasons']]
+
+    model_info = {'seasonal': seasonal, 'params': params, 'initial': initial,
+                  'start_ts': s.index[0].strftime('%Y-%m-%d %H:%M')}
+    forecast = fitted.forecast(HORIZON)
+    resid_std = float((s - fitted.fittedvalues).std())
+    return key, model_info, forecast, resid_std, cached is None
+
+
+# -----------------------------------------------------------------------------
+# 3. 배치 실행
+# -----------------------------------------------------------------------------
+def load_model_cache(path=None):
+    path = path or MODEL_CACHE_FILE
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"   -> [Error] 모델 캐시 로드 실패: {e}")
+        return {}
+
+
+def _cache_key(key):
+    return f"{key[0]}|{key[1]}"
+
+
+def build_tasks(series, cache, force=False):
+    """새 데이터가 없는 아이템은 제외하고, 새 데이터가 적으면 캐시 파라미터 재사용"""
+    tasks = []
+    for key, s in series.items():
+        entry = cache.get(_cache_key(key))
+        last_ts = s.index[-1].strftime('%Y-%m-%d %H:%M')
+        if len(s) < SEASONAL_PERIODS:
+            continue
+        if entry and not force and entry['last_ts'] == last_ts:
+            continue
+
+        cached = None
+        if entry and not force and entry.get('initial') and pd.Timestamp(entry['start_ts']) in s.index:
+            new_points = len(s.loc[s.index > pd.Timestamp(entry['last_ts'])])
+            if new_points < REFIT_AFTER and entry['points_since_fit'] + new_points < REFIT_AFTER:
+                cached = entry
+        # 캐시 경로는 초기 상태가 추정된 시점부터, 전체 적합은 최근 HISTORY_LIMIT개로 계산
+        fit_s = s.loc[pd.Timestamp(cached['start_ts']):] if cached else s.iloc[-HISTORY_LIMIT:]
+        tasks.append((key, fit_s.values, fit_s.index.values, cached))
+    return tasks
+
+
+def run_forecasts(data_dir=DATA_DIR, workers=None, force=False):
+    os.makedirs(FORECAST_DIR, exist_ok=True)
+    series = load_hourly_series(data_dir)
+    cache = load_model_cache()
+    tasks = build_tasks(series, cache, force)
+    print(f"--- 예측 대상 {len(tasks)}개 / 전체 {len(series)}개 ---")
+    if not tasks:
+        return 0
+
+    start = time.perf_counter()
+    rows = []
+    refit_count = 0
+    failed = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for result in executor.map(fit_item, tasks, chunksize=4):
+            if len(result) == 2:
+                failed.append(result[0])
+                print(f"   -> [Error] 적합 실패 ({result[0][0]} / {result[0][1]}): {result[1]}")
+                continue
+            key, model_info, forecast, resid_std, refit = result
+            s = series[key]
+            prev = cache.get(_cache_key(key), {})
+            new_points = len(s) if refit or not prev else len(s.loc[s.index > pd.Timestamp(prev['last_ts'])])
+            cache[_cache_key(key)] = {
+                **model_info,
+                'last_ts': s.index[-1].strftime('%Y-%m-%d %H:%M'),
+                'points_since_fit': 0 if refit else prev.get('points_since_fit', 0) + new_points
+            }
+            refit_count += int(refit)
+
+            # 오차 범위: 잔차 표준편차 x sqrt(예측 시점)
+            for step, (ts, yhat) in enumerate(forecast.items(), start=1):
+                band = 1.96 * resid_std * step ** 0.5
+                rows.append({
+                    'source': key[0], 'item_name': key[1],
+                    'forecast_at': ts.strftime('%Y-%m-%d %H:%M'),
+                    'yhat': round(float(yhat), 2),
+                    'lower': round(float(yhat) - band, 2),
+                    'upper': round(float(yhat) + band, 2)
+                })
+
+    # 실패한 아이템은 기존 예측/캐시를 유지하고 다음 실행에서 다시 시도
+    failed_keys = {_cache_key(k) for k in failed}
+    save_results(cache, rows, {_cache_key(t[0]) for t in tasks} - failed_keys)
+    done = len(tasks) - len(failed)
+    print(f"   -> 완료: {done}개 (재최적화 {refit_count}개, 실패 {len(failed)}개), {time.perf_counter() - start:.1f}초")
+    return done
+
+
+def save_results(cache, rows, updated_keys):
+    # 갱신된 아이템의 예측만 교체하고 나머지는 유지
+    new_df = pd.DataFrame(rows)
+    if os.path.exists(FORECAST_FILE):
+        old_df = pd.read_csv(FORECAST_FILE)
+        keep = ~(old_df['source'] + '|' + old_df['item_name']).isin(updated_keys)
+        new_df = pd.concat([old_df[keep], new_df], ignore_index=True)
+
+    tmp_path = FORECAST_FILE + '.tmp'
+    new_df.to_csv(tmp_path, index=False, encoding='utf-8-sig')
+    os.replace(tmp_path, FORECAST_FILE)
+
+    tmp_path = MODEL_CACHE_FILE + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(tmp_path, MODEL_CACHE_FILE)
+
+
+def check_cached_fit(data_dir=DATA_DIR, sample=15, tol=1e-6):
+    """같은 데이터에서 캐시 경로(고정 파라미터 + 초기 상태)의 예측이 전체 적합과 일치하는지 확인"""
+    series = load_hourly_series(data_dir)
+    keys = [k for k in sorted(series) if len(series[k]) >= SEASONAL_PERIODS]
+    keys = keys[::max(len(keys) // sample, 1)][:sample]
+
+    worst = 0.0
+    for key in keys:
+        s = series[key].iloc[-HISTORY_LIMIT:]
+        _, model_info, full, _, _ = _fit_item(key, s.values, s.index.values, None)
+        _, _, cached, _, refit = _fit_item(key, s.values, s.index.values, model_info)
+        diff = float((full - cached).abs().max() / max(full.abs().max(), 1.0))
+        worst = max(worst, diff)
+        if refit or diff > tol:
+            print(f"   -> [불일치] {key[0]} / {key[1]}: 최대 상대 오차 {diff:.2e}")
+
+    ok = worst <= tol
+    print(f"[{'검증 성공' if ok else '검증 실패'}] {len(keys)}개 아이템, 최대 상대 오차 {worst:.2e}")
+    return ok
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="전체 아이템 가격 예측 (ETS, 프로세스 풀)")
+    parser.add_argument('--workers', type=int, default=None, help="프로세스 수 (기본: CPU 수)")
+    parser.add_argument('--force', action='store_true', help="캐시를 무시하고 전체 재최적화")
+    parser.add_argument('--check', action='store_true', help="캐시 경로가 전체 적합과 같은 예측을 내는지 확인")
+    args = parser.parse_args(argv)
+    if args.check:
+        return 0 if check_cached_fit() else 1
+    run_forecasts(workers=args.workers, force=args.force)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+import os
+import json
+import time
+from datetime import datetime
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CATALOG_FILE = os.path.join(project_root, 'data', 'item_catalog.json')
+DAILY_STATS_FILE = os.path.join(project_root, 'data', 'market_daily_stats.csv')
+
+# 생활 재료 세부 카테고리 (거래소 CategoryCode)
+LIFE_SKILL_CATEGORIES = {
+    90200: "식물채집",
+    90300: "벌목",
+    90400: "채광",
+    90500: "수렵",
+    90600: "낚시",
+    90700: "고고학",
+}
+
+
+class ItemCatalog:
+    """거래소 ItemId -> 아이템 정보 매핑을 디스크에 캐싱
+
+    같은 이름의 서로 다른 아이템(거래 가능 횟수별 매물 등)이 있으므로 ItemId를 키로 사용
+    """
+
+    def __init__(self, path=CATALOG_FILE):
+        self.path = path
+        self.items = {}
+        self.new_items = []
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.items = json.load(f).get('items', {})
+        except Exception as e:
+            print(f"   -> [Error] 카탈로그 로드 실패: {e}")
+            self.items = {}
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'items': self.items}, f, ensure_ascii=False, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def register(self, item, category_code):
+        """API 응답 아이템을 카탈로그에 등록. 처음 보는 ItemId면 True"""
+        name = item.get('Name')
+        item_id = item.get('Id')
+        if not name or not item_id or str(item_id) in self.items:
+            return False
+
+        self.items[str(item_id)] = {
+            'name': name,
+            'category_code': category_code,
+            'grade': item.get('Grade'),
+            'first_seen': datetime.now().strftime('%Y-%m-%d %H:%M'),
+            'backfilled': False
+        }
+        self.new_items.append(item_id)
+        return True
+
+    def discover(self, api, category_code, item_tier=None, item_grade=None, max_pages=30, delay=0.12, register=True):
+        """카테고리 전체 페이지를 순회하며 아이템 목록 수집 (시세 포함)
+
+        일부만 추적하는 카테고리는 register=False로 호출하고, 호출 측에서 추적 대상만 등록한다.
+        """
+        found = []
+        for page in range(1, max_pages + 1):
+            data = api.get_market_items(category_code, item_tier=item_tier, item_grade=item_grade, page_no=page)
+            if not data or not data.get('Items'):
+                break
+
+            for item in data['Items']:
+                if register:
+                    self.register(item, category_code)
+                found.append(item)
+
+            if page * data.get('PageSize', 10) >= data.get('TotalCount', 0):
+                break
+            time.sleep(delay)
+        return found
+
+    def pending_backfill(self):
+        return [int(item_id) for item_id, entry in self.items.items() if not entry.get('backfilled')]
+
+
+def backfill_history(api, catalog, item_ids=None, limit=50, delay=0.12, stats_path=DAILY_STATS_FILE):
+    """신규 아이템의 최근 14일 일별 시세를 일괄 수집하여 market_daily_stats.csv에 병합"""
+    targets = item_ids if item_ids is not None else catalog.pending_backfill()
+    targets = [i for i in targets if str(i) in catalog.items][:limit]
+    if not targets:
+        return 0
+
+    print(f"\n[히스토리 백필] {len(targets)}개 아이템")
+    rows = []
+    for item_id in targets:
+        entry = catalog.items[str(item_id)]
+        data = api.get_market_item_history(item_id)
+        if data:
+            # 거래 가능 횟수별로 여러 항목이 올 수 있으므로 이름이 일치하는 첫 항목 사용
+            history = next((d for d in data if d.get('Name') == entry['name']), data[0])
+            for stat in history.get('Stats', []):
+                rows.append({
+                    'item_name': entry['name'],
+                    'item_id': item_id,
+                    'date': stat.get('Date'),
+                    'avg_price': stat.get('AvgPrice'),
+                    'trade_count': stat.get('TradeCount')
+                })
+            entry['backfilled'] = True
+        time.sleep(delay)
+
+    if rows:
+        merge_daily_stats(rows, stats_path)
+    catalog.save()
+    return len(rows)
+
+
+def merge_daily_stats(rows, path=DAILY_STATS_FILE):
+    # 백필이 있는 실행에서만 pandas 로드
+    import pandas as pd
+
+    new_df = pd.DataFrame(rows)
+    if os.path.exists(path):
+        try:
+            old_df = pd.read_csv(path)
+            new_df = pd.concat([old_df, new_df], ignore_index=True)
+        except Exception as e:
+            print(f"   -> [Error] 일별 통계 로드 실패: {e}")
+
+    # 같은 아이템/날짜는 최신 응답으로 덮어씀 (당일 통계는 갱신되므로)
+    new_df = new_df.drop_duplicates(subset=['item_id', 'date'], keep='last')
+    new_df = new_df.sort_values(['item_name', 'item_id', 'date'])
+    new_df.to_csv(path, index=False, encoding='utf-8-sig')
+    print(f"   -> [파일 저장] {os.path.basename(path)} ({len(rows)}건)")